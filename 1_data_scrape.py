@@ -6,27 +6,81 @@ Scrapes English reviews from Steam community pages
 from selenium import webdriver
 from selenium.webdriver.edge.options import Options
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 import re
-from time import sleep
+from time import monotonic
+from collections import deque
 from datetime import datetime
 import csv
 import argparse
 import json
+import os
+import queue
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 import requests
+from requests.adapters import HTTPAdapter
+
+from checkpoint import JsonCheckpoint
+from digest_store import DigestIndex
+from review_io import arrow_schema, format_path
+from review_text import has_non_english_script, text_digest
 
 
 # Configuration
 LANGUAGE_FILTER = 'english'
 MAX_SCROLL_ATTEMPTS = 3
 SCROLL_WAIT_TIME = 1.0
+MAX_SCROLL_WAIT = 15.0
+SCROLL_WAIT_FACTOR = 2.5
+SCROLL_LATENCY_HISTORY = 10
+WAIT_POLL_INTERVAL = 0.1
 PAGE_LOAD_WAIT = 2.0
 MAX_SCROLLS_PER_GAME = 200
+INCREMENTAL_CARD_SCAN = True
+BULK_CARD_EXTRACTION = True
 DEFAULT_TARGET_POSITIVE = 500
 DEFAULT_TARGET_NEGATIVE = 500
 DEFAULT_OUTPUT_FILE = 'steam_reviews_all_games.csv'
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+DEDUPE_INDEX_SUFFIX = '.seen.sqlite'
+SINK_BATCH_SIZE = 50
+SINK_FLUSH_INTERVAL = 5.0
+REVIEW_FIELDNAMES = [
+    'GlobalReviewId',
+    'GameId',
+    'GameName',
+    'Genre',
+    'Sentiment',
+    'ReviewText',
+    'ReviewLength_Chars',
+    'ReviewLength_Words',
+    'IsRecommended',
+    'HelpfulVotes',
+    'PlayHours_Text',
+    'PlayHours_Numeric',
+    'ReviewLanguage',
+    'DatePosted',
+    'OverallReviewSummary',
+    'TotalReviewCount',
+    'StoreTags',
+]
 STORE_URL_TEMPLATE = 'https://store.steampowered.com/app/{game_id}/'
+APPREVIEWS_URL_TEMPLATE = 'https://store.steampowered.com/appreviews/{game_id}'
+APPREVIEWS_PAGE_SIZE = 100
+HTTP_TIMEOUT = 15
+HTTP_POOL_SIZE = 10
+METADATA_CONCURRENCY = 4
+DEFAULT_BACKEND = 'browser'
+REQUEST_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    )
+}
 
 
 # Default game configuration (can be overridden via CLI config file)
@@ -74,6 +128,16 @@ def create_driver():
     return webdriver.Edge(options=options)
 
 
+def create_http_session(pool_size=HTTP_POOL_SIZE):
+    """Create a requests Session with a keep-alive connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(REQUEST_HEADERS)
+    return session
+
+
 def bypass_content_warning(driver):
     """
     Some games show a content warning / age gate on the community page.
@@ -94,7 +158,7 @@ def bypass_content_warning(driver):
 
         if button:
             button.click()
-            sleep(PAGE_LOAD_WAIT)
+            wait_for_page_state(driver, lambda state: state['cards'] > 0 or state['ended'], PAGE_LOAD_WAIT)
             print("Bypassed content warning by clicking 'View Community Hub'.")
     except NoSuchElementException:
         # No gate on this page – nothing to do
@@ -110,15 +174,12 @@ def get_review_url(game_id, review_type, language):
     return base_url + params
 
 
-def fetch_game_metadata(game_id):
-    """Fetch overall review summary, review count, and tags from Steam store page"""
+def fetch_game_metadata(game_id, session=None):
+    """
+    Fetch overall review summary, review count, and tags from Steam store page.
+    Pass a shared session to reuse keep-alive connections across games.
+    """
     url = STORE_URL_TEMPLATE.format(game_id=game_id)
-    headers = {
-        'User-Agent': (
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-            '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-    }
     metadata = {
         'overall_review_summary': '',
         'total_review_count': '',
@@ -126,7 +187,8 @@ def fetch_game_metadata(game_id):
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        http = session or requests
+        response = http.get(url, headers=REQUEST_HEADERS, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
         html = response.text
 
@@ -152,9 +214,66 @@ def fetch_game_metadata(game_id):
     return metadata
 
 
-def extract_helpful_votes(card):
-    """Extract helpful vote count from a review card"""
-    text = safe_find_element(card, './/div[contains(@class, "found_helpful")]', "")
+def prefetch_game_metadata(game_list, executor, session=None):
+    """
+    Submit a store-page metadata fetch for every game to executor, in list order.
+    Returns {game_id: Future}; callers block only on the future of the game they
+    are about to scrape, so scraping starts as soon as its metadata arrives.
+    """
+    futures = {}
+    for game in game_list:
+        if game['game_id'] not in futures:
+            futures[game['game_id']] = executor.submit(fetch_game_metadata, game['game_id'], session)
+    return futures
+
+
+# XPaths (relative to an apphub_Card) for every field we read from a review card
+CARD_FIELD_XPATHS = {
+    'content': './/div[@class="apphub_CardTextContent"]',
+    'date': './/div[@class="apphub_CardTextContent"]/div',
+    'thumb_text': './/div[@class="reviewInfo"]/div[2]',
+    'hours_text': './/div[@class="reviewInfo"]/div[3]',
+    'language': './/div[contains(@class, "language")]',
+    'helpful_text': './/div[contains(@class, "found_helpful")]',
+}
+
+# Reads the fields of every card from arguments[0] onwards in one driver round-trip.
+# Missing elements come back as null, mirroring NoSuchElementException in the per-card path.
+BULK_CARD_FIELDS_SCRIPT = """
+var cards = Array.prototype.slice.call(document.getElementsByClassName('apphub_Card'), arguments[0]);
+var xpaths = arguments[1];
+function readText(card, xpath) {
+    var node = document.evaluate(
+        xpath, card, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    return node ? node.innerText.trim() : null;
+}
+return cards.map(function (card) {
+    var fields = {};
+    for (var name in xpaths) {
+        fields[name] = readText(card, xpaths[name]);
+    }
+    return fields;
+});
+"""
+
+
+def fetch_card_fields(driver, start_index=0):
+    """Read raw fields for all cards from start_index onwards with a single execute_script call"""
+    return driver.execute_script(BULK_CARD_FIELDS_SCRIPT, start_index, CARD_FIELD_XPATHS)
+
+
+def read_card_fields(card):
+    """Read raw fields from a single card WebElement (one driver call per field)"""
+    return {
+        name: safe_find_element(card, xpath, None)
+        for name, xpath in CARD_FIELD_XPATHS.items()
+    }
+
+
+def extract_helpful_votes(fields):
+    """Extract helpful vote count from raw card fields"""
+    text = fields.get('helpful_text') or ""
     if not text:
         return 0
     match = re.search(r'(\d+)', text.replace(',', ''))
@@ -176,179 +295,305 @@ def extract_numeric_value(text, pattern=r'(\d+\.?\d*)'):
     return float(match.group(1)) if match else 0.0
 
 
-def is_english_review(card):
+def is_english_review(fields):
     """Check if review is in English"""
     # Check language indicator if available
-    language = safe_find_element(card, './/div[contains(@class, "language")]', "")
+    language = fields.get('language') or ""
     if language:
         return 'english' in language.lower()
     
     # If no language indicator, assume English (since URL filters for English)
     # Additional check: look for common non-English characters
-    review_content = safe_find_element(card, './/div[@class="apphub_CardTextContent"]', "")
-    if review_content:
-        # Check for common non-English character patterns
-        non_english_patterns = [
-            r'[\u4e00-\u9fff]',  # Chinese
-            r'[\u3040-\u309f\u30a0-\u30ff]',  # Japanese
-            r'[\u0400-\u04ff]',  # Cyrillic
-            r'[\u0590-\u05ff]',  # Hebrew
-            r'[\u0600-\u06ff]',  # Arabic
-        ]
-        for pattern in non_english_patterns:
-            if re.search(pattern, review_content):
-                return False
+    review_content = fields.get('content') or ""
+    if review_content and has_non_english_script(review_content):
+        return False
     
     return True
 
 
-def extract_review_data(card):
-    """Extract all data from a review card"""
-    try:
-        # Extract date and review content
-        date_posted = safe_find_element(card, './/div[@class="apphub_CardTextContent"]/div', "")
-        review_content_elem = card.find_element(By.XPATH, './/div[@class="apphub_CardTextContent"]')
-        review_content = review_content_elem.text.replace(date_posted, '').strip()
-        
-        # Calculate review lengths
-        review_length_chars = len(review_content.replace(' ', ''))
-        review_length_words = len(review_content.split())
-        
-        # Extract recommendation status
-        thumb_text = safe_find_element(card, './/div[@class="reviewInfo"]/div[2]', "")
-        if thumb_text:
-            # Check for "Not Recommended" first, then "Recommended"
-            if "Not Recommended" in thumb_text:
-                is_recommended = False
-            elif "Recommended" in thumb_text:
-                is_recommended = True
-            else:
-                is_recommended = None
+def extract_review_data(fields):
+    """Build the review record from raw card fields (no driver calls)"""
+    if fields.get('content') is None:
+        print("Error extracting review data: card has no review content")
+        return None
+
+    # Extract date and review content
+    date_posted = fields.get('date') or ""
+    review_content = fields['content'].replace(date_posted, '').strip()
+    
+    # Calculate review lengths
+    review_length_chars = len(review_content.replace(' ', ''))
+    review_length_words = len(review_content.split())
+    
+    # Extract recommendation status
+    thumb_text = fields.get('thumb_text') or ""
+    if thumb_text:
+        # Check for "Not Recommended" first, then "Recommended"
+        if "Not Recommended" in thumb_text:
+            is_recommended = False
+        elif "Recommended" in thumb_text:
+            is_recommended = True
         else:
             is_recommended = None
-        
-        # Extract play hours
-        play_hours_text = safe_find_element(card, './/div[@class="reviewInfo"]/div[3]', "")
-        play_hours = extract_numeric_value(play_hours_text)
-        
-        # Extract review language
-        review_language = safe_find_element(card, './/div[contains(@class, "language")]', "")
+    else:
+        is_recommended = None
+    
+    # Extract play hours
+    play_hours_text = fields.get('hours_text') or ""
+    play_hours = extract_numeric_value(play_hours_text)
+    
+    # Extract review language
+    review_language = fields.get('language') or ""
+
+    helpful_votes = extract_helpful_votes(fields)
+
+    return {
+        'review_content': review_content,
+        'review_length_chars': review_length_chars,
+        'review_length_words': review_length_words,
+        'is_recommended': is_recommended,
+        'play_hours_text': play_hours_text,
+        'play_hours': play_hours,
+        'review_language': review_language,
+        'date_posted': date_posted,
+        'helpful_votes': helpful_votes,
+    }
 
-        helpful_votes = extract_helpful_votes(card)
 
-        return {
-            'review_content': review_content,
-            'review_length_chars': review_length_chars,
-            'review_length_words': review_length_words,
-            'is_recommended': is_recommended,
-            'play_hours_text': play_hours_text,
-            'play_hours': play_hours,
-            'review_language': review_language,
-            'date_posted': date_posted,
-            'helpful_votes': helpful_votes,
-        }
-    except (NoSuchElementException, StaleElementReferenceException) as e:
-        print(f"Error extracting review data: {e}")
-        return None
+# Card count plus whether Steam shows its "no more content" marker at the bottom of the hub
+PAGE_STATE_SCRIPT = """
+var noMore = document.getElementById('NoMoreContent');
+return {
+    cards: document.getElementsByClassName('apphub_Card').length,
+    ended: !!(noMore && noMore.offsetParent !== null),
+    gated: document.querySelector('.btn_blue_steamui.btn_medium') !== null
+};
+"""
 
 
-def scroll_to_load_more(driver, last_position, max_attempts=MAX_SCROLL_ATTEMPTS):
-    """Scroll page to load more reviews"""
-    scroll_attempt = 0
-    
-    while scroll_attempt < max_attempts:
+def get_page_state(driver):
+    """Return {'cards': int, 'ended': bool, 'gated': bool} for the current review page"""
+    return driver.execute_script(PAGE_STATE_SCRIPT)
+
+
+def wait_for_page_state(driver, condition, timeout):
+    """
+    Poll the page state until condition(state) holds or timeout expires.
+    Returns (state, elapsed_seconds, satisfied).
+    """
+    def check(d):
+        state = get_page_state(d)
+        return state if condition(state) else False
+
+    started = monotonic()
+    satisfied = True
+    try:
+        state = WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL).until(check)
+    except TimeoutException:
+        state = get_page_state(driver)
+        satisfied = False
+    return state, monotonic() - started, satisfied
+
+
+class ScrollWaiter:
+    """
+    Adaptive timeout for infinite-scroll loads. Each wait returns as soon as new
+    cards appear; the timeout only bounds how long we wait for a page that is
+    slow or finished, and is learned from the latencies of recent loads.
+    """
+
+    def __init__(self, base_timeout=None, max_timeout=None, factor=None, history=None):
+        self.base_timeout = SCROLL_WAIT_TIME if base_timeout is None else base_timeout
+        self.max_timeout = MAX_SCROLL_WAIT if max_timeout is None else max_timeout
+        self.factor = SCROLL_WAIT_FACTOR if factor is None else factor
+        self.latencies = deque(maxlen=SCROLL_LATENCY_HISTORY if history is None else history)
+        self.waits = []
+
+    def timeout(self, attempt=0):
+        """Timeout for the given retry attempt: learned from recent loads, doubled per retry"""
+        learned = self.factor * max(self.latencies) if self.latencies else self.base_timeout
+        return min(self.max_timeout, max(self.base_timeout, learned) * (2 ** attempt))
+
+    def record(self, elapsed, loaded):
+        self.waits.append(elapsed)
+        if loaded:
+            self.latencies.append(elapsed)
+
+    def summary(self):
+        if not self.waits:
+            return "no scroll waits"
+        total = sum(self.waits)
+        return (
+            f"{len(self.waits)} scroll waits, {total:.1f}s total, "
+            f"{total / len(self.waits):.2f}s mean, {max(self.waits):.2f}s max, "
+            f"current timeout {self.timeout():.2f}s"
+        )
+
+
+def scroll_to_load_more(driver, last_count, waiter, max_attempts=None):
+    """
+    Scroll to the bottom and wait until more review cards are appended.
+    Returns (card_count, reached_end). The page is only declared ended when
+    Steam shows its end marker or max_attempts waits (with growing timeouts)
+    bring no new cards.
+    """
+    if max_attempts is None:
+        max_attempts = MAX_SCROLL_ATTEMPTS
+
+    for attempt in range(max_attempts):
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        sleep(SCROLL_WAIT_TIME)
-        driver.execute_script("window.scrollBy(0, 500);")
-        sleep(SCROLL_WAIT_TIME / 2)
-        
-        curr_position = driver.execute_script("return window.pageYOffset;")
-        
-        if curr_position == last_position:
-            scroll_attempt += 1
-            sleep(SCROLL_WAIT_TIME)
-            if scroll_attempt >= max_attempts:
-                return None, True  # Reached end
-        else:
-            return curr_position, False  # Made progress
-    
-    return None, True
+        timeout = waiter.timeout(attempt)
+        state, elapsed, _ = wait_for_page_state(
+            driver, lambda st: st['cards'] > last_count or st['ended'], timeout
+        )
+        loaded = state['cards'] > last_count
+        waiter.record(elapsed, loaded)
+        print(
+            f"Scroll wait {elapsed:.2f}s (timeout {timeout:.2f}s, attempt {attempt + 1}/{max_attempts}): "
+            f"{state['cards'] - last_count} new cards"
+        )
+        if loaded:
+            return state['cards'], False  # Made progress
+        if state['ended']:
+            return state['cards'], True  # Steam says there is nothing more
 
+    return last_count, True
 
-def scrape_reviews_for_game(driver, game, review_type, target_count, language=LANGUAGE_FILTER, game_metadata=None):
+
+def review_key(review_data):
+    """
+    Dedupe key for a review: stable digest of the full normalized text, so it
+    can be persisted and shared across workers and runs (unlike hash()).
+    """
+    return text_digest(review_data['review_content'])
+
+
+def add_game_fields(review_data, game, sentiment, game_metadata=None):
+    """Attach game-level, sentiment and store metadata fields to a review record"""
+    metadata_fields = game_metadata or {}
+    review_data.update(
+        {
+            'game_id': game['game_id'],
+            'game_name': game.get('game_name', str(game['game_id'])),
+            'genre': game.get('genre', ''),
+            'sentiment': sentiment,
+            'overall_review_summary': metadata_fields.get('overall_review_summary', ''),
+            'total_review_count': metadata_fields.get('total_review_count', ''),
+            'store_tags': metadata_fields.get('store_tags', []),
+        }
+    )
+    return review_data
+
+
+def get_new_cards(driver, processed_count):
+    """
+    Return only the review cards appended after the first processed_count cards.
+    Steam's infinite scroll only appends cards, so the DOM index works as a
+    high-water mark and already extracted cards never cross the driver again.
+    """
+    return driver.execute_script(
+        "return Array.prototype.slice.call("
+        "document.getElementsByClassName('apphub_Card'), arguments[0]);",
+        processed_count,
+    )
+
+
+def scrape_reviews_for_game(driver, game, review_type, target_count, language=LANGUAGE_FILTER, game_metadata=None,
+                            incremental=None, bulk=None, dedupe_index=None, on_review=None):
     """
     Scrape reviews for a single game and sentiment until target_count or page end.
     review_type: 'positivereviews' or 'negativereviews'
+    dedupe_index: DigestIndex shared across jobs/runs; defaults to a private in-memory one
+    on_review: if given, each review is passed to it as soon as it is collected
+    instead of being kept in the returned list
+    incremental: only extract cards added since the last pass (defaults to INCREMENTAL_CARD_SCAN)
+    bulk: read card fields with one execute_script per pass (defaults to BULK_CARD_EXTRACTION)
     """
+    if incremental is None:
+        incremental = INCREMENTAL_CARD_SCAN
+    if bulk is None:
+        bulk = BULK_CARD_EXTRACTION
     game_id = game['game_id']
     game_name = game.get('game_name', str(game_id))
-    genre = game.get('genre', '')
     sentiment = 'positive' if review_type == 'positivereviews' else 'negative'
 
     url = get_review_url(game_id, review_type, language)
     print(f"\nScraping {sentiment} reviews for {game_name} (ID {game_id}) from: {url}")
 
     driver.get(url)
-    sleep(PAGE_LOAD_WAIT)
+    wait_for_page_state(driver, lambda st: st['cards'] > 0 or st['gated'] or st['ended'], PAGE_LOAD_WAIT)
     # Some games show a content warning / age gate – try to skip it
     bypass_content_warning(driver)
     driver.maximize_window()
-    sleep(1)
 
     reviews = []
-    review_ids = set()
-    last_position = driver.execute_script("return window.pageYOffset;")
+    collected = 0
+    seen = dedupe_index if dedupe_index is not None else DigestIndex()
+    waiter = ScrollWaiter()
+    card_count = get_page_state(driver)['cards']
     running = True
     scrolls = 0
+    # High-water mark: number of cards (in DOM order) already handled
+    processed_cards = 0
+    cards_extracted = 0
+    cards_skipped = 0
 
-    while running and len(reviews) < target_count and scrolls < MAX_SCROLLS_PER_GAME:
-        # Get all review cards on current page
+    while running and collected < target_count and scrolls < MAX_SCROLLS_PER_GAME:
+        # Get review cards on current page (only the new ones in incremental mode)
         try:
-            cards = driver.find_elements(By.CLASS_NAME, 'apphub_Card')
-            print(f"Found {len(cards)} review cards on page")
+            start_index = processed_cards if incremental else 0
+            if bulk:
+                cards = fetch_card_fields(driver, start_index)
+            elif incremental:
+                cards = get_new_cards(driver, start_index)
+            else:
+                cards = driver.find_elements(By.CLASS_NAME, 'apphub_Card')
+            if incremental:
+                cards_skipped += processed_cards
+                print(
+                    f"Found {len(cards)} new review cards on page "
+                    f"({processed_cards} already processed)"
+                )
+            else:
+                processed_cards = 0
+                print(f"Found {len(cards)} review cards on page")
         except Exception as e:
             print(f"Error finding cards: {e}")
             break
 
         # Process each card
         for card in cards:
-            if len(reviews) >= target_count:
+            if collected >= target_count:
                 break
+            processed_cards += 1
+            cards_extracted += 1
             try:
-                # Extract review data
-                review_data = extract_review_data(card)
+                # Extract review data (bulk mode already holds the raw fields)
+                fields = card if bulk else read_card_fields(card)
+                review_data = extract_review_data(fields)
                 if not review_data:
                     continue
 
-                # Skip duplicates using review content hash
-                unique_key = hash(review_data['review_content'][:100])
-                if unique_key in review_ids:
-                    continue
-
                 # Only collect English reviews
-                if not is_english_review(card):
+                if not is_english_review(fields):
                     print(f"Skipping non-English review")
                     continue
 
+                # Skip duplicates (claims the digest for this review)
+                if not seen.add(review_key(review_data)):
+                    continue
+
                 # Add game-level and sentiment info
-                metadata_fields = game_metadata or {}
-                review_data.update(
-                    {
-                        'game_id': game_id,
-                        'game_name': game_name,
-                        'genre': genre,
-                        'sentiment': sentiment,
-                        'overall_review_summary': metadata_fields.get('overall_review_summary', ''),
-                        'total_review_count': metadata_fields.get('total_review_count', ''),
-                        'store_tags': metadata_fields.get('store_tags', []),
-                    }
-                )
+                add_game_fields(review_data, game, sentiment, game_metadata)
 
                 # Add to collection
-                review_ids.add(unique_key)
-                reviews.append(review_data)
+                if on_review is not None:
+                    on_review(review_data)
+                else:
+                    reviews.append(review_data)
+                collected += 1
                 print(
-                    f"Collected {len(reviews)}/{target_count} {sentiment} reviews for "
+                    f"Collected {collected}/{target_count} {sentiment} reviews for "
                     f"{game_name}: {review_data['play_hours']} hours"
                 )
 
@@ -360,125 +605,649 @@ def scrape_reviews_for_game(driver, game, review_type, target_count, language=LA
                 continue
 
         # Scroll to load more reviews
-        last_position, reached_end = scroll_to_load_more(driver, last_position)
+        card_count, reached_end = scroll_to_load_more(driver, card_count, waiter)
         scrolls += 1
         if reached_end:
             print(
                 f"Reached end of page for {game_name} ({sentiment}). "
-                f"Total reviews collected: {len(reviews)}"
+                f"Total reviews collected: {collected}"
             )
             running = False
         else:
             print(
-                f"Scrolled to position {last_position}, "
-                f"found {len(reviews)} {sentiment} reviews so far for {game_name}"
+                f"Page now has {card_count} cards, "
+                f"found {collected} {sentiment} reviews so far for {game_name}"
             )
 
-    if len(reviews) < target_count:
+    if collected < target_count:
         print(
-            f"Warning: Only collected {len(reviews)}/{target_count} {sentiment} reviews for {game_name}"
+            f"Warning: Only collected {collected}/{target_count} {sentiment} reviews for {game_name}"
         )
     if scrolls >= MAX_SCROLLS_PER_GAME:
         print(
             f"Reached max scroll limit ({MAX_SCROLLS_PER_GAME}) for {game_name} "
             f"while collecting {sentiment} reviews"
         )
+    print(
+        f"Card stats for {game_name} ({sentiment}): {cards_extracted} cards extracted, "
+        f"{cards_skipped} cards skipped as already processed"
+    )
+    print(f"Scroll wait stats for {game_name} ({sentiment}): {waiter.summary()}")
 
     return reviews
 
 
-def run_batch_scrape(
-    driver,
-    game_list,
-    language=LANGUAGE_FILTER,
-    writer=None,
-    start_index=1,
-):
+def format_posted_date(timestamp):
+    """Format a unix timestamp the way the community hub shows it ('Posted: 3 December[, 2023]')"""
+    posted = datetime.fromtimestamp(timestamp)
+    text = f"Posted: {posted.day} {posted.strftime('%B')}"
+    if posted.year != datetime.now().year:
+        text += f", {posted.year}"
+    return text
+
+
+def parse_api_review(review):
+    """Convert one review object from the appreviews JSON endpoint into a review record"""
+    review_content = (review.get('review') or '').strip()
+    author = review.get('author') or {}
+    play_hours = round(author.get('playtime_forever', 0) / 60, 1)
+    return {
+        'review_content': review_content,
+        'review_length_chars': len(review_content.replace(' ', '')),
+        'review_length_words': len(review_content.split()),
+        'is_recommended': review.get('voted_up'),
+        'play_hours_text': f"{play_hours} hrs on record",
+        'play_hours': play_hours,
+        'review_language': review.get('language', ''),
+        'date_posted': format_posted_date(review.get('timestamp_created', 0)),
+        'helpful_votes': review.get('votes_up', 0),
+    }
+
+
+def iter_appreviews_pages(session, game_id, review_type, language=LANGUAGE_FILTER):
     """
-    Run scraping for all games and sentiments.
+    Yield pages (lists of raw review objects) from Steam's appreviews JSON endpoint,
+    following the cursor until the endpoint runs out of reviews.
+    """
+    url = APPREVIEWS_URL_TEMPLATE.format(game_id=game_id)
+    cursor = '*'
+    seen_cursors = set()
+    while cursor not in seen_cursors:
+        seen_cursors.add(cursor)
+        params = {
+            'json': 1,
+            'cursor': cursor,
+            'filter': 'recent',
+            'language': language,
+            'review_type': 'positive' if review_type == 'positivereviews' else 'negative',
+            'purchase_type': 'all',
+            'num_per_page': APPREVIEWS_PAGE_SIZE,
+        }
+        response = session.get(url, params=params, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        payload = response.json()
+        if not payload.get('success'):
+            raise RuntimeError(f"appreviews request for game {game_id} was not successful")
 
-    If writer is provided, rows are written to CSV in real time and we keep a
-    running GlobalReviewId starting from start_index.
+        reviews = payload.get('reviews') or []
+        if not reviews:
+            return
+        yield reviews
+        cursor = payload.get('cursor') or cursor
+
+
+def scrape_reviews_via_api(session, game, review_type, target_count, language=LANGUAGE_FILTER, game_metadata=None,
+                           dedupe_index=None, on_review=None):
     """
-    all_reviews = []
-    global_id = start_index
+    HTTP-only counterpart of scrape_reviews_for_game: read reviews through the
+    appreviews endpoint with cursor paging and return the same review records
+    (or pass them to on_review as they arrive).
+    """
+    game_id = game['game_id']
+    game_name = game.get('game_name', str(game_id))
+    sentiment = 'positive' if review_type == 'positivereviews' else 'negative'
+    print(f"\nFetching {sentiment} reviews for {game_name} (ID {game_id}) from the appreviews endpoint")
 
-    for game in game_list:
-        positive_target = game.get('target_positive', DEFAULT_TARGET_POSITIVE)
-        negative_target = game.get('target_negative', DEFAULT_TARGET_NEGATIVE)
+    reviews = []
+    collected = 0
+    seen = dedupe_index if dedupe_index is not None else DigestIndex()
+    pages = 0
+    for page in iter_appreviews_pages(session, game_id, review_type, language):
+        pages += 1
+        for raw_review in page:
+            if collected >= target_count:
+                break
+            review_data = parse_api_review(raw_review)
+            if not review_data['review_content']:
+                continue
+
+            # Skip duplicates (claims the digest for this review)
+            if not seen.add(review_key(review_data)):
+                continue
+
+            add_game_fields(review_data, game, sentiment, game_metadata)
+            if on_review is not None:
+                on_review(review_data)
+            else:
+                reviews.append(review_data)
+            collected += 1
         print(
-            f"\n=== Starting game {game.get('game_name', game['game_id'])} "
-            f"(positive target: {positive_target}, negative target: {negative_target}) ==="
+            f"Page {pages}: found {collected}/{target_count} {sentiment} reviews so far for {game_name}"
         )
+        if collected >= target_count:
+            break
+
+    if collected < target_count:
+        print(
+            f"Warning: Only collected {collected}/{target_count} {sentiment} reviews for {game_name}"
+        )
+    return reviews
+
+
+def scrape_reviews(client, game, review_type, target_count, language=LANGUAGE_FILTER, game_metadata=None,
+                   backend=DEFAULT_BACKEND, dedupe_index=None, on_review=None):
+    """Scrape one (game, sentiment) job with the selected backend's client (WebDriver or Session)"""
+    if backend == 'http':
+        return scrape_reviews_via_api(client, game, review_type, target_count, language, game_metadata,
+                                      dedupe_index=dedupe_index, on_review=on_review)
+    return scrape_reviews_for_game(client, game, review_type, target_count, language, game_metadata,
+                                   dedupe_index=dedupe_index, on_review=on_review)
+
+
+def create_client(backend=DEFAULT_BACKEND):
+    """Create the scraping client for a backend: an Edge WebDriver or a pooled HTTP session"""
+    if backend == 'http':
+        return create_http_session()
+    return create_driver()
+
 
-        metadata = fetch_game_metadata(game['game_id'])
+def close_client(client, backend=DEFAULT_BACKEND):
+    """Release a client created by create_client, tolerating already-dead drivers"""
+    try:
+        if backend == 'http':
+            client.close()
+        else:
+            client.quit()
+            print("WebDriver closed.")
+    except Exception as exc:
+        print(f"Warning: Failed to close {backend} client cleanly: {exc}")
+
+
+def review_to_row(review, global_id):
+    """Convert a review record into an output row"""
+    return {
+        'GlobalReviewId': global_id,
+        'GameId': review.get('game_id'),
+        'GameName': review.get('game_name'),
+        'Genre': review.get('genre'),
+        'Sentiment': review.get('sentiment'),
+        'ReviewText': review['review_content'],
+        'ReviewLength_Chars': review['review_length_chars'],
+        'ReviewLength_Words': review['review_length_words'],
+        'IsRecommended': review['is_recommended'],
+        'HelpfulVotes': review.get('helpful_votes'),
+        'PlayHours_Text': review['play_hours_text'],
+        'PlayHours_Numeric': review['play_hours'],
+        'ReviewLanguage': review['review_language'],
+        'DatePosted': review['date_posted'],
+        'OverallReviewSummary': review.get('overall_review_summary'),
+        'TotalReviewCount': review.get('total_review_count'),
+        'StoreTags': '|'.join(review.get('store_tags', [])) if review.get('store_tags') else '',
+    }
+
+
+class ReviewSink(ABC):
+    """
+    Buffered sink for review records. write() assigns consecutive
+    GlobalReviewIds starting at start_index; rows are flushed to the output
+    once batch_size rows are buffered or flush_interval seconds have passed
+    since the last flush.
+
+    on_flush(sink) is called after each flush, once the rows are written.
+    Sinks are not thread-safe: a single writer thread should own one.
+    Subclasses implement _write_rows() and _close().
+    """
+
+    def __init__(self, path, start_index=1, batch_size=None, flush_interval=None, on_flush=None):
+        self.path = path
+        self.batch_size = SINK_BATCH_SIZE if batch_size is None else batch_size
+        self.flush_interval = SINK_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.on_flush = on_flush
+        self.next_id = start_index
+        self.rows_written = 0
+        self._buffer = []
+        self._last_flush = monotonic()
+        self._closed = False
+
+    def write(self, review):
+        """Buffer one review record and return its GlobalReviewId"""
+        global_id = self.next_id
+        self._buffer.append(review_to_row(review, global_id))
+        self.next_id += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+        return global_id
+
+    def flush_if_due(self):
+        if self._buffer and monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._write_rows(self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer.clear()
+        self._last_flush = monotonic()
+        if self.on_flush is not None:
+            self.on_flush(self)
+
+    def close(self):
+        if not self._closed:
+            self.flush()
+            self._close()
+            self._closed = True
+
+    @abstractmethod
+    def _write_rows(self, rows):
+        """Write buffered rows to the output"""
+
+    @abstractmethod
+    def _close(self):
+        """Release the output after the final flush"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvReviewSink(ReviewSink):
+    """
+    Semicolon-delimited CSV review sink. mode='a' appends without a header
+    (used by --resume). With fsync=True every flush is also forced to stable
+    storage.
+    """
+
+    def __init__(self, path, mode='w', start_index=1, batch_size=None, flush_interval=None, fsync=False,
+                 on_flush=None):
+        super().__init__(path, start_index, batch_size, flush_interval, on_flush)
+        self.fsync = fsync
+        self._file = open(path, mode, newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=REVIEW_FIELDNAMES, delimiter=';')
+        if mode == 'w':
+            self._writer.writeheader()
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def tell(self):
+        """Size of the flushed output, for checkpoints"""
+        return self._file.tell()
+
+    def _close(self):
+        self._file.close()
+
+
+class ColumnarReviewSink(ReviewSink):
+    """
+    Parquet or Arrow IPC (feather) review sink with the explicit schema from
+    review_io. Each flush becomes one row group / record batch. The file is
+    only readable once closed (the footer is written last), so columnar
+    output does not support checkpoints or --resume.
+    """
+
+    def __init__(self, path, fmt='parquet', start_index=1, batch_size=None, flush_interval=None, on_flush=None):
+        super().__init__(path, start_index, batch_size, flush_interval, on_flush)
+        import pyarrow as pa
+
+        self._pa = pa
+        self.fmt = fmt
+        self.schema = arrow_schema(REVIEW_FIELDNAMES)
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+
+    def _write_rows(self, rows):
+        if not rows:
+            return
+        for row in rows:
+            count = str(row['TotalReviewCount'] or '').replace(',', '')
+            row['TotalReviewCount'] = int(count) if count.isdigit() else None
+        table = self._pa.Table.from_pylist(rows, schema=self.schema)
+        self._writer.write_table(table)
+
+    def _close(self):
+        self._writer.close()
+
+
+def create_review_sink(path, fmt='csv', **kwargs):
+    """Create the review sink for an output format ('csv', 'parquet' or 'feather')"""
+    if fmt == 'csv':
+        return CsvReviewSink(path, **kwargs)
+    kwargs.pop('mode', None)
+    kwargs.pop('fsync', None)
+    return ColumnarReviewSink(path, fmt=fmt, **kwargs)
+
+
+def job_key(game, review_type):
+    """Stable identifier of a (game, sentiment) job, used in checkpoints"""
+    sentiment = 'positive' if review_type == 'positivereviews' else 'negative'
+    return f"{game['game_id']}:{sentiment}"
+
+
+def build_scrape_jobs(game_list, checkpoint=None):
+    """
+    Split the game list into (game, review_type, target) jobs:
+    positive then negative per game. With a checkpoint, completed jobs are
+    skipped and partially written jobs only ask for the remaining reviews.
+    """
+    jobs = []
+    for game in game_list:
+        targets = [
+            ('positivereviews', game.get('target_positive', DEFAULT_TARGET_POSITIVE)),
+            ('negativereviews', game.get('target_negative', DEFAULT_TARGET_NEGATIVE)),
+        ]
+        for review_type, target in targets:
+            if target <= 0:
+                continue
+            if checkpoint is not None:
+                key = job_key(game, review_type)
+                if checkpoint.is_completed(key):
+                    print(f"Skipping {key}: already completed in checkpoint")
+                    continue
+                target -= checkpoint.rows_written(key)
+                if target <= 0:
+                    continue
+            jobs.append((game, review_type, target))
+    return jobs
+
+
+class ScrapeCheckpoint(JsonCheckpoint):
+    """
+    Progress record of a scrape run so that --resume can continue after a crash:
+    completed jobs, rows written per job, the last GlobalReviewId and the
+    output size at the time of the last save. Reviews already written are
+    rejected on resume by the dedupe index rebuilt from the output.
+    """
+
+    def initial_state(self):
+        return {
+            'completed_jobs': [],
+            'counts': {},
+            'last_global_id': 0,
+            'output_offset': 0,
+        }
+
+    @property
+    def last_global_id(self):
+        return self.state['last_global_id']
+
+    @property
+    def output_offset(self):
+        return self.state['output_offset']
+
+    def is_completed(self, key):
+        return key in self.state['completed_jobs']
+
+    def rows_written(self, key):
+        return self.state['counts'].get(key, 0)
+
+    def add_rows(self, key, count):
+        """Record rows written to the output for a job"""
+        self.state['counts'][key] = self.state['counts'].get(key, 0) + count
 
-        # Positive reviews
-        if positive_target > 0:
+    def mark_completed(self, key):
+        if key not in self.state['completed_jobs']:
+            self.state['completed_jobs'].append(key)
+
+    def save(self, last_global_id, output_offset):
+        super().save(last_global_id=last_global_id, output_offset=output_offset)
+
+
+def rebuild_dedupe_index(dedupe_index, path, batch_size=10_000):
+    """
+    Refill the dedupe index from the ReviewText column of an output CSV.
+    Digests are claimed as soon as a review is collected, so after a crash the
+    index also holds reviews that were still buffered and never written;
+    rebuilding from the cut-back output lets the resumed run collect them again.
+    """
+    dedupe_index.clear()
+    batch = []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f, delimiter=';'):
+            batch.append(text_digest(row['ReviewText']))
+            if len(batch) >= batch_size:
+                dedupe_index.add_many(batch)
+                batch = []
+    dedupe_index.add_many(batch)
+    return len(dedupe_index)
+
+
+def scrape_worker(worker_id, job_queue, results, get_metadata, language, backend, dedupe_index, client=None):
+    """
+    Pull jobs from job_queue until it is empty. Every collected review is pushed
+    onto results as ('review', job, review) while the job runs, followed by
+    ('done', job, ok) when it ends.
+
+    The worker creates its own client unless one is passed in. If a job raises,
+    an owned client is closed and replaced before the next job, so a crashed
+    driver never leaks and never poisons the remaining jobs.
+    """
+    owns_client = client is None
+    try:
+        while True:
             try:
-                positive_reviews = scrape_reviews_for_game(
-                    driver,
-                    game,
-                    review_type='positivereviews',
-                    target_count=positive_target,
-                    language=language,
-                    game_metadata=metadata,
-                )
-                all_reviews.extend(positive_reviews)
-            except Exception as exc:
-                print(
-                    f"Error scraping positive reviews for {game.get('game_name')}: {exc}"
-                )
+                job = job_queue.get_nowait()
+            except queue.Empty:
+                return
+            game, review_type, target = job
+
+            if client is None:
+                try:
+                    client = create_client(backend)
+                except Exception as exc:
+                    print(f"[worker {worker_id}] Could not start {backend} client: {exc}")
+                    job_queue.put(job)
+                    return
 
-        # Negative reviews
-        if negative_target > 0:
+            print(
+                f"\n=== [worker {worker_id}] Starting {game.get('game_name', game['game_id'])} "
+                f"{review_type} (target: {target}) ==="
+            )
+            ok = True
             try:
-                negative_reviews = scrape_reviews_for_game(
-                    driver,
+                scrape_reviews(
+                    client,
                     game,
-                    review_type='negativereviews',
-                    target_count=negative_target,
+                    review_type=review_type,
+                    target_count=target,
                     language=language,
-                    game_metadata=metadata,
+                    game_metadata=get_metadata(game),
+                    backend=backend,
+                    dedupe_index=dedupe_index,
+                    on_review=lambda review: results.put(('review', job, review)),
                 )
-                all_reviews.extend(negative_reviews)
             except Exception as exc:
                 print(
-                    f"Error scraping negative reviews for {game.get('game_name')}: {exc}"
+                    f"[worker {worker_id}] Error scraping {review_type} for {game.get('game_name')}: {exc}"
                 )
+                ok = False
+                if owns_client:
+                    close_client(client, backend)
+                    client = None
+            results.put(('done', job, ok))
+    finally:
+        if owns_client and client is not None:
+            close_client(client, backend)
 
-        print(
-            f"Finished {game.get('game_name', game['game_id'])}: "
-            f"{positive_target} positive, {negative_target} negative targets."
-        )
 
-        # If streaming to CSV, write as we go
-        if writer is not None:
-            for review in all_reviews:
-                writer.writerow({
-                    'GlobalReviewId': global_id,
-                    'GameId': review.get('game_id'),
-                    'GameName': review.get('game_name'),
-                    'Genre': review.get('genre'),
-                    'Sentiment': review.get('sentiment'),
-                    'ReviewText': review['review_content'],
-                    'ReviewLength_Chars': review['review_length_chars'],
-                    'ReviewLength_Words': review['review_length_words'],
-                    'IsRecommended': review['is_recommended'],
-                    'HelpfulVotes': review.get('helpful_votes'),
-                    'PlayHours_Text': review['play_hours_text'],
-                    'PlayHours_Numeric': review['play_hours'],
-                    'ReviewLanguage': review['review_language'],
-                    'DatePosted': review['date_posted'],
-                    'OverallReviewSummary': review.get('overall_review_summary'),
-                    'TotalReviewCount': review.get('total_review_count'),
-                    'StoreTags': '|'.join(review.get('store_tags', [])) if review.get('store_tags') else '',
-                })
-                global_id += 1
-            # Clear memory – reviews are already on disk
-            all_reviews.clear()
-
-    return all_reviews, global_id
+def run_batch_scrape(
+    driver,
+    game_list,
+    language=LANGUAGE_FILTER,
+    sink=None,
+    backend=DEFAULT_BACKEND,
+    workers=1,
+    metadata_concurrency=METADATA_CONCURRENCY,
+    checkpoint=None,
+    dedupe_index=None,
+):
+    """
+    Run scraping for all games and sentiments.
+
+    Every (game, review_type) pair is a job; `workers` threads each drive their
+    own client (a WebDriver for 'browser' or a requests Session for 'http') and
+    pull jobs from a shared queue. If driver is given it is used by the first
+    worker and left open; other clients are created and closed by the pool.
+
+    Store-page metadata for all games is prefetched concurrently (at most
+    metadata_concurrency requests in flight) while the workers start.
+
+    A single writer thread owns the sink. If a sink (e.g. CsvReviewSink) is
+    provided, reviews are streamed to it while scraping runs and it hands out
+    the GlobalReviewIds; otherwise the reviews are collected and returned.
+
+    If writing to the sink fails, the jobs not yet started are dropped and the
+    error is raised once the workers have stopped.
+
+    Reviews are deduplicated across all jobs and workers through dedupe_index
+    (a DigestIndex of full-text digests); pass a persistent one to also reject
+    reviews collected by earlier runs. Defaults to an in-memory index.
+
+    If a ScrapeCheckpoint is given, jobs it marks as completed are skipped and it
+    is saved after every sink flush. Failed jobs are not marked completed, so a
+    resumed run retries them.
+
+    Returns (collected reviews, next GlobalReviewId).
+    """
+    jobs = build_scrape_jobs(game_list, checkpoint)
+    if dedupe_index is None:
+        dedupe_index = DigestIndex()
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+    results = queue.Queue()
+
+    # Fetch all store-page metadata up front, concurrently, over one pooled session
+    metadata_session = create_http_session(pool_size=metadata_concurrency)
+    metadata_executor = ThreadPoolExecutor(max_workers=metadata_concurrency, thread_name_prefix='metadata')
+    metadata_futures = prefetch_game_metadata(game_list, metadata_executor, metadata_session)
+
+    def get_metadata(game):
+        return metadata_futures[game['game_id']].result()
+
+    all_reviews = []
+    job_counts = {}
+    jobs_done = [0]
+    # Checkpoint entries waiting for the rows they describe to be flushed
+    pending_counts = {}
+    pending_completed = []
+
+    def save_checkpoint(flushed_sink):
+        for key, count in pending_counts.items():
+            checkpoint.add_rows(key, count)
+        for key in pending_completed:
+            checkpoint.mark_completed(key)
+        pending_counts.clear()
+        pending_completed.clear()
+        checkpoint.save(flushed_sink.next_id - 1, flushed_sink.tell())
+
+    if sink is not None and checkpoint is not None:
+        sink.on_flush = save_checkpoint
+
+    idle_timeout = sink.flush_interval if sink is not None else SINK_FLUSH_INTERVAL
+    writer_errors = []
+
+    def write_results():
+        while True:
+            try:
+                item = results.get(timeout=idle_timeout)
+            except queue.Empty:
+                if sink is not None:
+                    sink.flush_if_due()
+                continue
+            if item is None:
+                return
+            kind, (game, review_type, target), payload = item
+            key = job_key(game, review_type)
+            if kind == 'review':
+                job_counts[key] = job_counts.get(key, 0) + 1
+                if sink is None:
+                    all_reviews.append(payload)
+                    continue
+                if checkpoint is not None:
+                    pending_counts[key] = pending_counts.get(key, 0) + 1
+                sink.write(payload)
+                continue
+
+            # kind == 'done'
+            if sink is not None:
+                if checkpoint is not None and payload:
+                    pending_completed.append(key)
+                sink.flush()
+            jobs_done[0] += 1
+            print(
+                f"Finished {game.get('game_name', game['game_id'])} {review_type}"
+                f"{'' if payload else ' (failed)'}: {job_counts.get(key, 0)}/{target} reviews "
+                f"({jobs_done[0]}/{len(jobs)} jobs done)"
+            )
+
+    def run_writer():
+        try:
+            write_results()
+        except BaseException as exc:
+            print(f"Review writer failed: {exc}")
+            writer_errors.append(exc)
+            # Stop the workers after their current job and discard what they still send
+            while True:
+                try:
+                    job_queue.get_nowait()
+                except queue.Empty:
+                    break
+            while results.get() is not None:
+                pass
+
+    writer_thread = threading.Thread(target=run_writer, name='review-writer')
+    writer_thread.start()
+
+    workers = max(1, min(workers, len(jobs) or 1))
+    print(f"Scraping {len(jobs)} jobs with {workers} {backend} worker(s)")
+    worker_threads = [
+        threading.Thread(
+            target=scrape_worker,
+            args=(worker_id, job_queue, results, get_metadata, language, backend, dedupe_index),
+            kwargs={'client': driver if worker_id == 0 else None},
+            name=f'scrape-worker-{worker_id}',
+        )
+        for worker_id in range(workers)
+    ]
+    try:
+        for thread in worker_threads:
+            thread.start()
+        for thread in worker_threads:
+            thread.join()
+    finally:
+        results.put(None)
+        writer_thread.join()
+        if sink is not None and not writer_errors:
+            sink.flush()
+        metadata_executor.shutdown(wait=False, cancel_futures=True)
+        metadata_session.close()
+    if writer_errors:
+        raise writer_errors[0]
+
+    if not job_queue.empty():
+        print(f"Warning: {job_queue.qsize()} jobs were not run because no worker could start a client")
+
+    return all_reviews, sink.next_id if sink is not None else len(all_reviews) + 1
 
 
 def load_game_list(config_path, default_positive, default_negative):
@@ -516,7 +1285,11 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Batch Steam review scraper")
     parser.add_argument('--config', help='Path to JSON file containing game list', default=None)
     parser.add_argument('--language', default=LANGUAGE_FILTER, help='Language filter for reviews')
+    parser.add_argument('--backend', choices=['browser', 'http'], default=DEFAULT_BACKEND,
+                        help="Scrape with an Edge browser or the appreviews JSON endpoint (no browser)")
     parser.add_argument('--output', default=DEFAULT_OUTPUT_FILE, help='Output CSV filename')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                        help='Output format; columnar formats replace the extension of --output')
     parser.add_argument('--default-positive', type=int, default=DEFAULT_TARGET_POSITIVE,
                         help='Default positive review target per game')
     parser.add_argument('--default-negative', type=int, default=DEFAULT_TARGET_NEGATIVE,
@@ -524,21 +1297,49 @@ def parse_args():
     parser.add_argument('--max-scrolls-per-game', type=int, default=MAX_SCROLLS_PER_GAME,
                         help='Safety cap on scroll iterations per game')
     parser.add_argument('--max-scroll-attempts', type=int, default=MAX_SCROLL_ATTEMPTS,
-                        help='Attempts before assuming page end when scroll position is static')
+                        help='Scroll waits without new cards before assuming page end')
     parser.add_argument('--scroll-wait', type=float, default=SCROLL_WAIT_TIME,
-                        help='Wait (seconds) between scroll actions')
+                        help='Minimum timeout (seconds) when waiting for a scroll to load more cards')
+    parser.add_argument('--max-scroll-wait', type=float, default=MAX_SCROLL_WAIT,
+                        help='Upper bound (seconds) on the adaptive scroll wait timeout')
     parser.add_argument('--page-wait', type=float, default=PAGE_LOAD_WAIT,
-                        help='Wait (seconds) after loading each page')
-    return parser.parse_args()
+                        help='Maximum wait (seconds) for review cards to appear after loading a page')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of parallel scrape workers (one driver or HTTP session each)')
+    parser.add_argument('--metadata-concurrency', type=int, default=METADATA_CONCURRENCY,
+                        help='Maximum concurrent store-page metadata requests')
+    parser.add_argument('--checkpoint', default=None,
+                        help=f'Checkpoint file (default: <output>{CHECKPOINT_SUFFIX})')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue a crashed run from its checkpoint, appending to the output CSV '
+                             '(CSV output only)')
+    parser.add_argument('--flush-rows', type=int, default=SINK_BATCH_SIZE,
+                        help='Flush buffered output rows to disk after this many rows')
+    parser.add_argument('--flush-seconds', type=float, default=SINK_FLUSH_INTERVAL,
+                        help='Flush buffered output rows to disk at least this often')
+    parser.add_argument('--fsync', action='store_true',
+                        help='fsync the output after every flush for crash durability')
+    parser.add_argument('--full-rescan', action='store_true',
+                        help='Re-extract every card on the page after each scroll instead of only new cards')
+    parser.add_argument('--extraction', choices=['bulk', 'per-card'], default='bulk',
+                        help='Read card fields with one script call per pass (bulk) or per-element driver calls')
+    args = parser.parse_args()
+    if args.resume and args.format != 'csv':
+        parser.error("--resume needs --format csv: columnar files cannot be appended after a crash")
+    return args
 
 
 def apply_runtime_overrides(args):
     """Apply runtime configuration overrides from CLI arguments"""
-    global MAX_SCROLLS_PER_GAME, MAX_SCROLL_ATTEMPTS, SCROLL_WAIT_TIME, PAGE_LOAD_WAIT
+    global MAX_SCROLLS_PER_GAME, MAX_SCROLL_ATTEMPTS, SCROLL_WAIT_TIME, MAX_SCROLL_WAIT, PAGE_LOAD_WAIT
+    global INCREMENTAL_CARD_SCAN, BULK_CARD_EXTRACTION
     MAX_SCROLLS_PER_GAME = args.max_scrolls_per_game
     MAX_SCROLL_ATTEMPTS = args.max_scroll_attempts
     SCROLL_WAIT_TIME = args.scroll_wait
+    MAX_SCROLL_WAIT = args.max_scroll_wait
     PAGE_LOAD_WAIT = args.page_wait
+    INCREMENTAL_CARD_SCAN = not args.full_rescan
+    BULK_CARD_EXTRACTION = args.extraction == 'bulk'
 
 
 def save_to_csv(reviews, filename=DEFAULT_OUTPUT_FILE):
@@ -551,55 +1352,10 @@ def save_to_csv(reviews, filename=DEFAULT_OUTPUT_FILE):
     # filename = f'Steam_Reviews_{game_id}_{today}.csv'
     # filename = f'Steam_Reviews_{game_id}.csv'
     
-    fieldnames = [
-        'GlobalReviewId',
-        'GameId',
-        'GameName',
-        'Genre',
-        'Sentiment',
-        'ReviewText',
-        'ReviewLength_Chars',
-        'ReviewLength_Words',
-        'IsRecommended',
-        'HelpfulVotes',
-        'PlayHours_Text',
-        'PlayHours_Numeric',
-        'ReviewLanguage',
-        'DatePosted',
-        'OverallReviewSummary',
-        'TotalReviewCount',
-        'StoreTags',
-    ]
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=fieldnames,
-            delimiter=';',
-        )
-        writer.writeheader()
-
-        # Add sequential reviewID starting from 1
-        for idx, review in enumerate(reviews, start=1):
-            writer.writerow({
-                'GlobalReviewId': idx,
-                'GameId': review.get('game_id'),
-                'GameName': review.get('game_name'),
-                'Genre': review.get('genre'),
-                'Sentiment': review.get('sentiment'),
-                'ReviewText': review['review_content'],
-                'ReviewLength_Chars': review['review_length_chars'],
-                'ReviewLength_Words': review['review_length_words'],
-                'IsRecommended': review['is_recommended'],
-                'HelpfulVotes': review.get('helpful_votes'),
-                'PlayHours_Text': review['play_hours_text'],
-                'PlayHours_Numeric': review['play_hours'],
-                'ReviewLanguage': review['review_language'],
-                'DatePosted': review['date_posted'],
-                'OverallReviewSummary': review.get('overall_review_summary'),
-                'TotalReviewCount': review.get('total_review_count'),
-                'StoreTags': '|'.join(review.get('store_tags', [])) if review.get('store_tags') else '',
-            })
+    # Add sequential reviewID starting from 1
+    with CsvReviewSink(filename, start_index=1) as sink:
+        for review in reviews:
+            sink.write(review)
     
     print(f"\nTotal reviews collected: {len(reviews)}")
     print(f"Data saved to {filename}")
@@ -616,45 +1372,68 @@ def main():
         default_negative=args.default_negative,
     )
 
-    # Open CSV once and stream rows as we scrape so progress is never lost
-    fieldnames = [
-        'GlobalReviewId',
-        'GameId',
-        'GameName',
-        'Genre',
-        'Sentiment',
-        'ReviewText',
-        'ReviewLength_Chars',
-        'ReviewLength_Words',
-        'IsRecommended',
-        'HelpfulVotes',
-        'PlayHours_Text',
-        'PlayHours_Numeric',
-        'ReviewLanguage',
-        'DatePosted',
-        'OverallReviewSummary',
-        'TotalReviewCount',
-        'StoreTags',
-    ]
-
-    with open(args.output, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=';')
-        writer.writeheader()
+    output = format_path(args.output, args.format) if args.format != 'csv' else args.output
+    checkpoint_path = args.checkpoint or output + CHECKPOINT_SUFFIX
+    checkpoint = ScrapeCheckpoint.load(checkpoint_path) if args.resume else None
+    if args.resume and checkpoint is not None and not os.path.exists(output):
+        print(f"Output {output} is missing; ignoring checkpoint {checkpoint_path}")
+        checkpoint = None
+    elif args.resume and checkpoint is None:
+        print(f"No checkpoint found at {checkpoint_path}; starting a fresh run")
+
+    if checkpoint is not None:
+        # Drop any rows written after the last checkpoint so ids stay unique
+        with open(output, 'r+b') as raw:
+            raw.truncate(checkpoint.output_offset)
+        mode, start_index = 'a', checkpoint.last_global_id + 1
+        print(
+            f"Resuming from {checkpoint_path}: {len(checkpoint.state['completed_jobs'])} jobs done, "
+            f"continuing at GlobalReviewId {start_index}"
+        )
+    elif args.format == 'csv':
+        checkpoint = ScrapeCheckpoint(checkpoint_path)
+        mode, start_index = 'w', 1
+    else:
+        mode, start_index = 'w', 1
 
-        driver = create_driver()
-        try:
-            # We ignore the returned list to keep memory low; data is on disk
-            _, final_id = run_batch_scrape(
-                driver,
-                game_list,
-                language=args.language,
-                writer=writer,
-                start_index=1,
-            )
-            print(f"\nStreaming write complete. Last GlobalReviewId: {final_id - 1}")
-        finally:
-            driver.quit()
-            print("WebDriver closed.")
+    # The dedupe index lives next to the output: rebuilt from the cut-back
+    # output on resume, reset otherwise
+    dedupe_index = DigestIndex(output + DEDUPE_INDEX_SUFFIX)
+    if mode == 'w':
+        dedupe_index.clear()
+    else:
+        rebuild_dedupe_index(dedupe_index, output)
+    print(f"Dedupe index {dedupe_index.path}: {len(dedupe_index)} known reviews")
+
+    # Open the output once and stream rows in small batches as we scrape so
+    # progress is never lost
+    with create_review_sink(
+        output,
+        args.format,
+        mode=mode,
+        start_index=start_index,
+        batch_size=args.flush_rows,
+        flush_interval=args.flush_seconds,
+        fsync=args.fsync,
+    ) as sink:
+        if checkpoint is not None:
+            checkpoint.save(sink.next_id - 1, sink.tell())
+
+        # Each worker opens and closes its own client; the returned list is
+        # empty because rows are already on disk
+        _, final_id = run_batch_scrape(
+            None,
+            game_list,
+            language=args.language,
+            sink=sink,
+            backend=args.backend,
+            workers=args.workers,
+            metadata_concurrency=args.metadata_concurrency,
+            checkpoint=checkpoint,
+            dedupe_index=dedupe_index,
+        )
+        print(f"\nStreaming write complete. Last GlobalReviewId: {final_id - 1}")
+    dedupe_index.close()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,25 @@
+import argparse
 import json
+import numpy as np
+import os
 import pandas as pd
 import re
 import requests
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
 
-from langdetect import detect
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from time import perf_counter
+from urllib.parse import urlparse
+
+from digest_store import DigestCache, DigestIndex
+from review_io import ReviewWriter, format_path, iter_reviews, read_reviews, write_reviews
+from review_text import detect_languages, quick_is_english, seed_language_detector, text_digest
 
 
 DEFAULT_GAME_CONFIG = [
@@ -41,17 +56,300 @@ DEFAULT_GAME_CONFIG = [
     { "game_id": 2001120, "game_name": "Split Fiction", "genre": "Co-op / Multiplayer" },
 ]
 game_appids = [config["game_id"] for config in DEFAULT_GAME_CONFIG]
-game_metadata = {}
+
+RAW_REVIEWS_PATH = "steam_reviews_all_games.csv"
+CLEANED_REVIEWS_PATH = "steam_reviews_cleaned.csv"
+# Rows per chunk in streaming mode (--chunksize)
+STREAM_CHUNK_SIZE = 100_000
+# Incremental mode (--incremental) records processed raw rows next to the output
+MANIFEST_SUFFIX = ".manifest.sqlite"
+
+# langdetect results are memoized by text digest across runs
+LANGUAGE_CACHE_PATH = "steam_reviews_language.sqlite"
+LANGUAGE_CHUNK_SIZE = 256
+
+# Review date formats, tried in order ('Posted: ' is stripped first)
+REVIEW_DATE_FORMATS = ["%B %d", "%d %B"]
+
+# Store / SteamSpy responses are cached per (appid, source) for METADATA_TTL_HOURS
+METADATA_SOURCES = {
+    "store": "https://store.steampowered.com/api/appdetails?appids={appid}",
+    "steamspy": "https://steamspy.com/api.php?request=appdetails&appid={appid}",
+}
+METADATA_CACHE_PATH = "steam_metadata_cache.sqlite"
+METADATA_TTL_HOURS = 24
+HTTP_TIMEOUT = 15
+HTTP_POOL_SIZE = 10
+METADATA_WORKERS = 8
+
+# Per-host token buckets as (requests per second, burst). The store API allows
+# about 200 appdetails calls per 5 minutes, SteamSpy one call per second.
+HOST_RATE_LIMITS = {
+    "store.steampowered.com": (0.6, 10),
+    "steamspy.com": (1.0, 1),
+}
+# Rate limiting and server errors are retried with exponential backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a request may be sent"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class MetadataCache:
+    """
+    sqlite cache of raw metadata API responses keyed by (appid, source).
+    Entries older than ttl seconds count as missing unless stale entries are
+    explicitly allowed (offline mode). put() can also seed the cache by hand.
+    """
+
+    def __init__(self, path=":memory:", ttl=METADATA_TTL_HOURS * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            "appid INTEGER NOT NULL, source TEXT NOT NULL, fetched_at REAL NOT NULL, payload TEXT NOT NULL, "
+            "PRIMARY KEY (appid, source))"
+        )
+        self._conn.commit()
+
+    def get(self, appid, source, allow_stale=False):
+        """Cached payload, or None when missing or older than the TTL"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, payload FROM metadata WHERE appid = ? AND source = ?", (appid, source)
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at, payload = row
+        if not allow_stale and self.ttl is not None and time.time() - fetched_at > self.ttl:
+            return None
+        return json.loads(payload)
+
+    def put(self, appid, source, payload, fetched_at=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (appid, source, fetched_at, payload) VALUES (?, ?, ?, ?)",
+                (appid, source, fetched_at or time.time(), json.dumps(payload)),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def is_usable_metadata(appid, source, payload):
+    """False for API responses without metadata, e.g. a store answer with "success": false"""
+    if not isinstance(payload, dict):
+        return False
+    if source == "store":
+        entry = payload.get(str(appid))
+        return isinstance(entry, dict) and bool(entry.get("success")) and "data" in entry
+    return True
+
+
+class MetadataFetcher:
+    """
+    Fetches metadata API responses through the cache with one pooled session.
+    refresh ignores cached entries; offline never touches the network and
+    uses cached entries regardless of age. Safe to share between threads:
+    requests are rate limited per host and retried with backoff.
+    """
+
+    def __init__(self, cache=None, refresh=False, offline=False, timeout=HTTP_TIMEOUT,
+                 rate_limits=HOST_RATE_LIMITS, max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+        self.cache = cache
+        self.refresh = refresh
+        self.offline = offline
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.buckets = {host: TokenBucket(rate, burst) for host, (rate, burst) in rate_limits.items()}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_json(self, appid, source):
+        """API response for appid; only usable responses are cached, so failed lookups are retried next run"""
+        if self.cache is not None and not self.refresh:
+            payload = self.cache.get(appid, source, allow_stale=self.offline)
+            if payload is not None and is_usable_metadata(appid, source, payload):
+                return payload
+        if self.offline:
+            raise LookupError(f"No cached {source} metadata for {appid} (offline)")
+
+        response = self.request(METADATA_SOURCES[source].format(appid=appid))
+        # SteamSpy answers with a UTF-8 BOM
+        payload = json.loads(response.content.decode("utf-8-sig"))
+        if not is_usable_metadata(appid, source, payload):
+            raise LookupError(f"No {source} metadata for {appid} in the API response")
+        if self.cache is not None:
+            self.cache.put(appid, source, payload)
+        return payload
+
+    def request(self, url):
+        """GET url within the host's rate limit, retrying timeouts, 429 and 5xx"""
+        host = urlparse(url).hostname
+        bucket = self.buckets.get(host)
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            delay = self.backoff * 2 ** attempt
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} from {host}", response=response)
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            if attempt == self.max_retries:
+                raise error
+            print(f"{host}: {error}; retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+
+# Raw columns that preprocessing drops; they are pruned at read time
+UNUSED_RAW_COLUMNS = (
+    "GameName",
+    "ReviewLength_Chars", "ReviewLength_Words",
+    "ReviewLanguage",
+    "OverallReviewSummary", "StoreTags",
+)
+
+
+def is_used_raw_column(name):
+    """usecols predicate for raw review files"""
+    return name not in UNUSED_RAW_COLUMNS
+
+
+class ReviewManifest:
+    """
+    sqlite record of the raw reviews already preprocessed: GlobalReviewId ->
+    digest of the raw row. A row is reprocessed when its id is new or its
+    digest changed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed (global_id INTEGER PRIMARY KEY, digest BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load(self):
+        return dict(self._conn.execute("SELECT global_id, digest FROM processed"))
+
+    def update(self, rows, removed=()):
+        """Record (global_id, digest) pairs and forget removed ids, in one transaction"""
+        self._conn.executemany("INSERT OR REPLACE INTO processed (global_id, digest) VALUES (?, ?)", rows)
+        self._conn.executemany("DELETE FROM processed WHERE global_id = ?", ((i,) for i in removed))
+        self._conn.commit()
+
+    def clear(self):
+        self._conn.execute("DELETE FROM processed")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def row_digests(df):
+    """Digest of every raw row (all fields as text), used to spot changed rows"""
+    values = df.astype(str)
+    rows = values.iloc[:, 0].str.cat(values.iloc[:, 1:], sep="\x1f")
+    return [text_digest(row) for row in rows]
 
 
 class ReviewFilteringHelper:
     @classmethod
-    def is_english(cls, text):
-        """Detect English reviews using langdetect."""
-        try:
-            return detect(text) == "en"
-        except:
-            return False
+    def detect_languages_parallel(cls, texts, workers=None, chunk_size=LANGUAGE_CHUNK_SIZE, executor=None):
+        """
+        Run langdetect over texts in chunks on a process pool; keeps input order.
+        Pass a long-lived executor (see language_executor) to reuse its workers.
+        """
+        if not texts:
+            return []
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        if executor is None and (workers == 1 or len(chunks) == 1):
+            seed_language_detector()
+            return detect_languages(texts)
+        if executor is not None:
+            return [language for chunk in executor.map(detect_languages, chunks) for language in chunk]
+        with cls.language_executor(workers) as executor:
+            return [language for chunk in executor.map(detect_languages, chunks) for language in chunk]
+
+    @classmethod
+    def language_executor(cls, workers=None):
+        """Process pool with seeded langdetect workers"""
+        return ProcessPoolExecutor(max_workers=workers, initializer=seed_language_detector)
+
+    @classmethod
+    def english_mask(cls, texts, workers=None, cache=None, executor=None):
+        """
+        Boolean mask of English reviews. Each distinct text is classified once:
+        the pre-pass settles clear cases, the cache answers texts detected on
+        earlier runs and only the rest goes to langdetect.
+        """
+        texts = texts.fillna("").astype(str)
+        digests = texts.map(text_digest)
+        unique_texts = dict(zip(digests, texts))
+
+        verdicts = {}
+        ambiguous = []
+        for digest, text in unique_texts.items():
+            quick = quick_is_english(text)
+            if quick is None:
+                ambiguous.append(digest)
+            else:
+                verdicts[digest] = quick
+
+        cached = cache.get_many(ambiguous) if cache is not None else {}
+        misses = [digest for digest in ambiguous if digest not in cached]
+        detected = dict(zip(
+            misses, cls.detect_languages_parallel([unique_texts[d] for d in misses], workers, executor=executor)
+        ))
+        if cache is not None and detected:
+            cache.put_many(detected.items())
+        for digest, language in {**cached, **detected}.items():
+            verdicts[digest] = language == "en"
+
+        print(f"Language filter: {len(unique_texts)} distinct texts, "
+              f"{len(unique_texts) - len(ambiguous)} by pre-pass, {len(cached)} cached, {len(detected)} detected")
+        return digests.map(verdicts).astype(bool)
 
     @classmethod
     def parse_hours(cls, text):
@@ -62,11 +360,18 @@ class ReviewFilteringHelper:
         if value:
             return float(value[0])
         return 0.0
+
+    @classmethod
+    def parse_hours_column(cls, texts):
+        """Vectorized parse_hours: first number in each text, 0.0 when there is none"""
+        hours = texts.astype("string").str.extract(r"([\d\.]+)", expand=False)
+        return pd.to_numeric(hours, errors="coerce").fillna(0.0).astype(float)
     
     @classmethod
-    def clean_date(cls, text):
+    def clean_date(cls, text, today=None):
+        today = today or datetime.today()
         if pd.isna(text):
-            return datetime.today().strftime("%Y-%m-%d")
+            return today.strftime("%Y-%m-%d")
 
         # Example: 'Posted: 3 December'
         text = text.replace("Posted: ", "").strip()
@@ -78,34 +383,88 @@ class ReviewFilteringHelper:
             try:
                 parsed_date = datetime.strptime(text, '%d %B')
             except ValueError:
-                return datetime.today().strftime("%Y-%m-%d")
-        parsed_date = parsed_date.replace(year=datetime.now().year)
+                return today.strftime("%Y-%m-%d")
+        parsed_date = parsed_date.replace(year=today.year)
         return parsed_date.strftime("%Y-%m-%d")
+
+    @classmethod
+    def clean_date_column(cls, texts, today=None):
+        """
+        Vectorized clean_date. Dates repeat heavily, so each distinct text is
+        parsed once with pd.to_datetime and the results are broadcast back.
+        Unparseable or missing dates become today (fixed once per call).
+        """
+        today = today or datetime.today()
+        today_str = today.strftime("%Y-%m-%d")
+        codes, uniques = pd.factorize(texts)
+        cleaned = pd.Series(uniques, dtype="string").str.replace("Posted: ", "", regex=False).str.strip()
+        # Parse with the current year appended; the row-wise version sets it afterwards
+        with_year = cleaned + f" {today.year}"
+        parsed = pd.Series(pd.NaT, index=cleaned.index, dtype="datetime64[ns]")
+        for fmt in REVIEW_DATE_FORMATS:
+            missing = parsed.isna()
+            if not missing.any():
+                break
+            parsed[missing] = pd.to_datetime(with_year[missing], format=f"{fmt} %Y", errors="coerce")
+        # strptime without a year rejects Feb 29 (1900 is no leap year); keep that behaviour
+        parsed[(parsed.dt.month == 2) & (parsed.dt.day == 29)] = pd.NaT
+        formatted = parsed.dt.strftime("%Y-%m-%d").fillna(today_str).to_numpy(dtype=object)
+        # Missing texts have code -1, which picks the trailing today entry
+        formatted = np.append(formatted, today_str)
+        return pd.Series(formatted[codes], index=texts.index, dtype=object)
     
     @classmethod
-    def preprocess(cls):
-        filename = f"steam_reviews_all_games.csv"
-        df = pd.read_csv(filename, sep=";")
-        df["GlobalReviewId"] = pd.to_numeric(df["GlobalReviewId"], errors="coerce").fillna(0).astype(int)
-        df["TotalReviewCount"] = (
-            df["TotalReviewCount"]
-            .astype(str)
-            .str.replace(",", "", regex=False)
+    def preprocess(cls, filename=RAW_REVIEWS_PATH, input_format=None, dedupe=True, language_workers=None,
+                   language_cache=LANGUAGE_CACHE_PATH, compact=True, arrow_strings=False):
+        # Reads the Parquet/feather version of the raw file instead when it is newer
+        df = read_reviews(
+            filename, fmt=input_format, columns=is_used_raw_column, sep=";", compact=compact, arrow_strings=arrow_strings
         )
-        df["TotalReviewCount"] = pd.to_numeric(df["TotalReviewCount"], errors="coerce").fillna(0).astype(int)
-        df = df[df["ReviewText"].fillna("").str.len() > 5]
-        df = df[df["ReviewText"].apply(cls.is_english)]
-        df = df.drop_duplicates(subset=["ReviewText"])
-        df["PlayHours"] = df["PlayHours_Text"].apply(cls.parse_hours)
-        df["DatePosted"] = df["DatePosted"].apply(cls.clean_date)
-
-        columns_to_drop = [
-            "GameName",
-            "ReviewLength_Chars", "ReviewLength_Words",
-            "PlayHours_Text", "ReviewLanguage",
-            "OverallReviewSummary", "StoreTags"
-        ]
-        df = df.drop(columns=[c for c in columns_to_drop if c in df.columns])
+        cache = DigestCache(language_cache, table="language") if language_cache else None
+        try:
+            return cls.clean_reviews(df, dedupe=dedupe, language_workers=language_workers, language_cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    @classmethod
+    def clean_reviews(cls, df, dedupe=True, dedupe_index=None, language_workers=None, language_cache=None,
+                      language_executor=None, today=None):
+        """
+        Filter, dedupe and parse a frame of raw reviews (a whole file or one
+        chunk of it). With a dedupe_index, duplicates are dropped by text digest
+        against everything the index has seen, including earlier chunks.
+        """
+        # One boolean mask over ReviewText; each step only looks at rows that are still in
+        text = df["ReviewText"]
+        keep = (text.fillna("").str.len() > 5).to_numpy(dtype=bool)
+        keep[keep] = cls.english_mask(
+            text[keep], workers=language_workers, cache=language_cache, executor=language_executor
+        ).to_numpy()
+        # The scraper already rejects duplicates by full-text digest; this pass
+        # only matters for raw files scraped before the dedupe index existed.
+        # Both branches compare digests of the normalized text, so whole-file,
+        # streaming and incremental runs drop the same rows
+        if dedupe:
+            digests = text[keep].map(text_digest)
+            if dedupe_index is not None:
+                keep[keep] = dedupe_index.add_many(digests)
+            else:
+                keep[keep] = ~digests.duplicated().to_numpy()
+
+        # The only copy of the frame, made after all rows are dropped
+        df = df.take(np.flatnonzero(keep))
+        df["GlobalReviewId"] = pd.to_numeric(df["GlobalReviewId"], errors="coerce").fillna(0).astype(int)
+        df["TotalReviewCount"] = pd.to_numeric(
+            df["TotalReviewCount"].astype(str).str.replace(",", "", regex=False), errors="coerce"
+        ).fillna(0).astype(int)
+        df["PlayHours"] = cls.parse_hours_column(df.pop("PlayHours_Text"))
+        df["DatePosted"] = cls.clean_date_column(df["DatePosted"], today=today)
+
+        # Normally pruned at read time (usecols=is_used_raw_column)
+        unused = [c for c in UNUSED_RAW_COLUMNS if c in df.columns]
+        if unused:
+            df = df.drop(columns=unused)
         return df
 
 
@@ -143,9 +502,8 @@ class GameMetadataHelper:
         return None
 
     @classmethod
-    def parse_steam_metadata(cls, appid):
-        url = f"https://store.steampowered.com/api/appdetails?appids={appid}"
-        res = requests.get(url).json()
+    def parse_steam_metadata(cls, appid, fetcher):
+        res = fetcher.get_json(appid, "store")
         
         data = res[str(appid)]["data"]
         name = data.get("name", "Unknown")
@@ -160,11 +518,8 @@ class GameMetadataHelper:
         }
     
     @classmethod
-    def parse_steamspy(cls, appid):
-        url = f"https://steamspy.com/api.php?request=appdetails&appid={appid}"
-        response = requests.get(url)
-        res = response.content.decode("utf-8-sig")
-        res = json.loads(res)
+    def parse_steamspy(cls, appid, fetcher):
+        res = fetcher.get_json(appid, "steamspy")
         
         low, high = res["owners"].replace(",", "").split(" .. ")
         owners_low = int(low)
@@ -193,33 +548,45 @@ class GameMetadataHelper:
         }
     
     @classmethod
-    def get_full_metadata(cls, appid):
-        meta_store = cls.parse_steam_metadata(appid)
-        meta_spy = cls.parse_steamspy(appid)
-        return {**meta_store, **meta_spy}
-    
-    @classmethod
-    def build_metadata_dataset(cls):
+    def build_metadata_dataset(cls, fetcher=None, workers=METADATA_WORKERS, appids=None):
+        """
+        Fetch store and SteamSpy metadata for all games concurrently (both
+        sources of an app run in parallel too). Returns the metadata frame and
+        a dict of failed appids mapped to the error.
+        """
+        fetcher = fetcher or MetadataFetcher()
+        appids = game_appids if appids is None else appids
+        parsers = {"store": cls.parse_steam_metadata, "steamspy": cls.parse_steamspy}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                (appid, source): executor.submit(parser, appid, fetcher)
+                for appid in appids
+                for source, parser in parsers.items()
+            }
+
         rows = []
-        for appid in game_appids:
+        failures = {}
+        for appid in appids:
             try:
-                row = cls.get_full_metadata(appid)
+                row = {}
+                for source in parsers:
+                    row.update(futures[(appid, source)].result())
                 rows.append(row)
             except Exception as e:
-                print(f"Failed to fetch {appid}: {e}")
+                failures[appid] = f"{type(e).__name__}: {e}"
 
-        return pd.DataFrame(rows)
+        return pd.DataFrame(rows), failures
 
 
 class ReviewMetadataHelper:
     @classmethod
-    def map_popularity(cls, appid):
-        return game_metadata.get(appid, {}).get("popularity_bucket", "Unknown")
+    def map_popularity(cls, appid, metadata):
+        return metadata.get(appid, {}).get("popularity_bucket", "Unknown")
 
     @classmethod
-    def release_phase(cls, appid, review_date):
+    def release_phase(cls, appid, review_date, metadata):
         try:
-            release = datetime.strptime(game_metadata[appid]["release_date"], "%Y-%m-%d")
+            release = datetime.strptime(metadata[appid]["release_date"], "%Y-%m-%d")
             review = datetime.strptime(review_date, "%Y-%m-%d")
         except:
             return "Unknown"
@@ -231,19 +598,445 @@ class ReviewMetadataHelper:
             return "First Year"
         else:
             return "Post-Year"
+
+    @classmethod
+    def metadata_frame(cls, metadata):
+        """Per-game frame (GameId, popularity_bucket, release_date) from the metadata dict"""
+        return pd.DataFrame(
+            {
+                "GameId": list(metadata),
+                "popularity_bucket": [meta.get("popularity_bucket", "Unknown") for meta in metadata.values()],
+                "release_date": [meta.get("release_date") for meta in metadata.values()],
+            }
+        )
+
+    @classmethod
+    def add_game_phases(cls, df, metadata):
+        """
+        Vectorized map_popularity and release_phase: merge the per-game metadata
+        on GameId and bucket the month difference with np.select.
+        """
+        merged = df[["GameId"]].merge(cls.metadata_frame(metadata), on="GameId", how="left")
+        df["popularity_bucket"] = merged["popularity_bucket"].fillna("Unknown").to_numpy()
+
+        release = pd.to_datetime(merged["release_date"], format="%Y-%m-%d", errors="coerce")
+        review = pd.to_datetime(df["DatePosted"].to_numpy(), format="%Y-%m-%d", errors="coerce")
+        diff_months = (
+            (review.year - release.dt.year.to_numpy()) * 12 + (review.month - release.dt.month.to_numpy())
+        )
+        df["release_phase"] = np.select(
+            [np.isnan(diff_months), diff_months <= 3, diff_months <= 12],
+            ["Unknown", "Launch Period", "First Year"],
+            default="Post-Year",
+        )
+        return df
         
     @classmethod
-    def create_preprocess_dataset(cls, df):
-        df["popularity_bucket"] = df["GameId"].apply(cls.map_popularity)
-        df["release_phase"] = df.apply(
-            lambda row: cls.release_phase(row["GameId"], row["DatePosted"]),
-            axis=1
+    def create_preprocess_dataset(cls, df, metadata, output_path=CLEANED_REVIEWS_PATH, output_format="csv"):
+        df = cls.add_game_phases(df, metadata)
+        path = write_reviews(df, output_path, fmt=output_format)
+        print(f"Saved {len(df)} cleaned reviews to {path}")
+
+
+def synthetic_reviews(rows, seed=0):
+    """Synthetic PlayHours_Text / DatePosted columns shaped like scraped data"""
+    rng = np.random.default_rng(seed)
+    hours = pd.Series(rng.gamma(1.5, 60, rows).round(1)).astype(str) + " hrs on record"
+    hours[rng.random(rows) < 0.02] = None
+    months = np.array(["January", "February", "March", "April", "May", "June", "July",
+                       "August", "September", "October", "November", "December"])
+    days = rng.integers(1, 29, rows).astype(str)
+    names = months[rng.integers(0, 12, rows)]
+    day_first = rng.random(rows) < 0.5
+    dates = pd.Series(np.where(day_first, np.char.add(np.char.add(days, " "), names),
+                               np.char.add(np.char.add(names, " "), days)))
+    dates = "Posted: " + dates
+    # Older reviews carry a year and fall back to today, like in the scraped file
+    older = rng.random(rows) < 0.1
+    dates[older] = dates[older] + ", 2023"
+    dates[rng.random(rows) < 0.01] = None
+    return pd.DataFrame({"PlayHours_Text": hours, "DatePosted": dates})
+
+
+def benchmark_parsing(rows=1_000_000):
+    """Time the row-wise and vectorized hour/date parsers and check they agree"""
+    df = synthetic_reviews(rows)
+    today = datetime.today()
+    print(f"Benchmarking hour/date parsing on {rows} synthetic rows")
+
+    start = perf_counter()
+    hours_rowwise = df["PlayHours_Text"].apply(ReviewFilteringHelper.parse_hours)
+    dates_rowwise = df["DatePosted"].apply(ReviewFilteringHelper.clean_date, today=today)
+    rowwise_time = perf_counter() - start
+
+    start = perf_counter()
+    hours_vectorized = ReviewFilteringHelper.parse_hours_column(df["PlayHours_Text"])
+    dates_vectorized = ReviewFilteringHelper.clean_date_column(df["DatePosted"], today=today)
+    vectorized_time = perf_counter() - start
+
+    identical = hours_rowwise.equals(hours_vectorized) and dates_rowwise.equals(dates_vectorized)
+    print(f"Row-wise apply: {rowwise_time:.2f}s")
+    print(f"Vectorized:     {vectorized_time:.2f}s ({rowwise_time / vectorized_time:.1f}x faster)")
+    print(f"Identical output: {identical}")
+
+
+def load_game_metadata(cache_path=METADATA_CACHE_PATH, ttl_hours=METADATA_TTL_HOURS, refresh=False,
+                       offline=False, workers=METADATA_WORKERS, appids=None):
+    """
+    Fetch (or read from the cache) metadata for the configured games.
+    Returns {appid: metadata} and {appid: error} for the games that failed.
+    """
+    metadata_cache = MetadataCache(cache_path, ttl=ttl_hours * 3600)
+    fetcher = MetadataFetcher(metadata_cache, refresh=refresh, offline=offline)
+    try:
+        meta_df, failed_apps = GameMetadataHelper.build_metadata_dataset(fetcher, workers=workers, appids=appids)
+    finally:
+        fetcher.close()
+        metadata_cache.close()
+    metadata = meta_df.set_index("appid").to_dict(orient="index") if not meta_df.empty else {}
+    return metadata, failed_apps
+
+
+def preprocess_streaming(metadata, input_path=RAW_REVIEWS_PATH, output_path=CLEANED_REVIEWS_PATH,
+                         chunksize=STREAM_CHUNK_SIZE, input_format=None, output_format="csv", dedupe=True,
+                         language_workers=None, language_cache=LANGUAGE_CACHE_PATH, compact=True,
+                         arrow_strings=False):
+    """
+    Clean and enrich the raw reviews chunk by chunk, appending each chunk to
+    the output, so memory is bounded by the chunk size instead of the corpus.
+    Duplicates are tracked in an on-disk digest index across chunks; the
+    language pool and 'today' are shared by all chunks.
+    """
+    today = datetime.today()
+    cache = DigestCache(language_cache, table="language") if language_cache else None
+    executor = ReviewFilteringHelper.language_executor(language_workers) if language_workers != 1 else None
+    rows_read = 0
+    try:
+        with tempfile.TemporaryDirectory() as index_dir, \
+                DigestIndex(f"{index_dir}/seen.sqlite") as dedupe_index, \
+                ReviewWriter(output_path, fmt=output_format) as writer:
+            chunks = iter_reviews(
+                input_path, chunksize, fmt=input_format, columns=is_used_raw_column, sep=";", compact=compact,
+                arrow_strings=arrow_strings,
+            )
+            for chunk in chunks:
+                rows_read += len(chunk)
+                chunk = ReviewFilteringHelper.clean_reviews(
+                    chunk,
+                    dedupe=dedupe,
+                    dedupe_index=dedupe_index,
+                    language_workers=language_workers,
+                    language_cache=cache,
+                    language_executor=executor,
+                    today=today,
+                )
+                writer.write(ReviewMetadataHelper.add_game_phases(chunk, metadata))
+                print(f"Processed {rows_read} rows, {writer.rows} cleaned reviews written")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if cache is not None:
+            cache.close()
+    print(f"Saved {writer.rows} cleaned reviews to {writer.path}")
+    return writer.path
+
+
+def preprocess_incremental(metadata, input_path=RAW_REVIEWS_PATH, output_path=CLEANED_REVIEWS_PATH,
+                           manifest_path=None, input_format=None, output_format="csv", dedupe=True,
+                           language_workers=None, language_cache=LANGUAGE_CACHE_PATH, compact=True,
+                           arrow_strings=False):
+    """
+    Preprocess only the raw reviews that are new or changed since the last run
+    and merge them into the existing cleaned output. Rows whose id disappeared
+    from the raw file are dropped from the output. New rows are deduplicated
+    against the reviews already in the output; when a removed or changed row
+    was the kept copy of a duplicated text, the raw rows with that text are
+    reprocessed so the next copy takes its place. When only rows with higher
+    ids were added, CSV output is appended to instead of rewritten.
+    """
+    output_file = format_path(output_path, output_format)
+    manifest = ReviewManifest(manifest_path or output_file + MANIFEST_SUFFIX)
+    try:
+        if os.path.exists(output_file):
+            processed = manifest.load()
+        else:
+            processed = {}
+            manifest.clear()
+
+        raw = read_reviews(
+            input_path, fmt=input_format, columns=is_used_raw_column, sep=";", compact=compact,
+            arrow_strings=arrow_strings,
+        )
+        ids = pd.to_numeric(raw["GlobalReviewId"], errors="coerce").fillna(0).astype(int).to_numpy()
+        digests = row_digests(raw)
+        pending_mask = np.array([processed.get(i) != d for i, d in zip(ids.tolist(), digests)], dtype=bool)
+        removed = processed.keys() - set(ids.tolist())
+        print(f"Incremental run: {len(raw)} raw rows, {pending_mask.sum()} new or changed, {len(removed)} removed")
+        if not pending_mask.any() and not removed:
+            print(f"{output_file} is up to date")
+            return output_file
+        replace_ids = set(ids[pending_mask].tolist()) | removed
+
+        existing = None
+        append = False
+        if processed:
+            existing = read_reviews(output_file, fmt=output_format, columns=["GlobalReviewId", "ReviewText"])
+            leaving = existing.loc[existing["GlobalReviewId"].isin(replace_ids), "ReviewText"]
+            if dedupe and not leaving.empty:
+                # Later copies of a leaving text were dropped as duplicates and are
+                # already in the manifest; queue them again like a full run would see them
+                leaving_digests = set(leaving.map(text_digest))
+                requeue = ~pending_mask & raw["ReviewText"].map(text_digest).isin(leaving_digests).to_numpy()
+                if requeue.any():
+                    print(f"Requeued {requeue.sum()} raw rows sharing their text with rows leaving the output")
+                    pending_mask |= requeue
+                    replace_ids |= set(ids[requeue].tolist())
+            # Appending keeps the output ordered by GlobalReviewId only if every new id is larger
+            append = (
+                output_format == "csv"
+                and not removed
+                and (existing.empty or ids[pending_mask].min() > existing["GlobalReviewId"].max())
+            )
+            if not append:
+                existing = read_reviews(output_file, fmt=output_format, compact=compact, arrow_strings=arrow_strings)
+                existing = existing[~existing["GlobalReviewId"].isin(replace_ids)]
+
+        dedupe_index = DigestIndex()
+        if dedupe and existing is not None:
+            dedupe_index.add_many(existing["ReviewText"].map(text_digest))
+        cache = DigestCache(language_cache, table="language") if language_cache else None
+        try:
+            cleaned = ReviewFilteringHelper.clean_reviews(
+                raw[pending_mask].copy(),
+                dedupe=dedupe,
+                dedupe_index=dedupe_index,
+                language_workers=language_workers,
+                language_cache=cache,
+            )
+        finally:
+            dedupe_index.close()
+            if cache is not None:
+                cache.close()
+        cleaned = ReviewMetadataHelper.add_game_phases(cleaned, metadata)
+
+        if append:
+            cleaned.to_csv(output_file, mode="a", header=False, index=False)
+            print(f"Appended {len(cleaned)} cleaned reviews to {output_file}")
+        else:
+            if existing is not None and cleaned.empty:
+                cleaned = existing
+            elif existing is not None:
+                cleaned = pd.concat([existing, cleaned], ignore_index=True).sort_values("GlobalReviewId", kind="stable")
+            write_reviews(cleaned, output_path, fmt=output_format)
+            print(f"Saved {len(cleaned)} cleaned reviews to {output_file}")
+
+        # Recorded only after the output is written; an interrupted run redoes its rows
+        manifest.update(zip(ids[pending_mask].tolist(), [d for d, p in zip(digests, pending_mask) if p]), removed)
+    finally:
+        manifest.close()
+    return output_file
+
+
+def synthetic_raw_reviews(rows, seed=0):
+    """Synthetic raw review file contents with the scraper's columns"""
+    rng = np.random.default_rng(seed)
+    df = synthetic_reviews(rows, seed)
+    words = np.array("the game is fun but servers lag and i love it a lot not worth the money great story".split())
+    lengths = rng.integers(8, 120, rows)
+    texts = pd.Series([" ".join(words[rng.integers(0, len(words), n)]) for n in lengths])
+    # Foreign-script, too-short and duplicated reviews, like a real scrape
+    texts[rng.random(rows) < 0.1] = "отличная игра, всем советую"
+    texts[rng.random(rows) < 0.05] = "gg"
+    duplicated = rng.random(rows) < 0.1
+    texts[duplicated] = texts.sample(int(duplicated.sum()), replace=True, random_state=seed).to_numpy()
+    config = [DEFAULT_GAME_CONFIG[i] for i in rng.integers(0, len(DEFAULT_GAME_CONFIG), rows)]
+    return pd.DataFrame({
+        "GlobalReviewId": np.arange(1, rows + 1),
+        "GameId": [game["game_id"] for game in config],
+        "GameName": [game["game_name"] for game in config],
+        "Genre": [game["genre"] for game in config],
+        "Sentiment": rng.choice(["positive", "negative"], rows),
+        "ReviewText": texts,
+        "ReviewLength_Chars": texts.str.len(),
+        "ReviewLength_Words": lengths,
+        "IsRecommended": rng.random(rows) < 0.7,
+        "HelpfulVotes": rng.integers(0, 500, rows),
+        "PlayHours_Text": df["PlayHours_Text"],
+        "PlayHours_Numeric": rng.gamma(1.5, 60, rows).round(1),
+        "ReviewLanguage": "english",
+        "DatePosted": df["DatePosted"],
+        "OverallReviewSummary": "Very Positive",
+        "TotalReviewCount": "1,234,567",
+        "StoreTags": "Action, FPS, Multiplayer, Shooter, Free to Play, Battle Royale, Team-Based, Competitive",
+    })
+
+
+def benchmark_memory(rows=1_000_000):
+    """
+    Compare peak traced memory of the previous chained filters (full read, one
+    copy per step) with the single-mask clean_reviews on pruned columns.
+    """
+    today = datetime.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/raw.csv"
+        synthetic_raw_reviews(rows).to_csv(path, sep=";", index=False)
+        print(f"Benchmarking preprocessing memory on {rows} synthetic rows")
+
+        def chained():
+            df = read_reviews(path, sep=";")
+            df["GlobalReviewId"] = pd.to_numeric(df["GlobalReviewId"], errors="coerce").fillna(0).astype(int)
+            df["TotalReviewCount"] = df["TotalReviewCount"].astype(str).str.replace(",", "", regex=False)
+            df["TotalReviewCount"] = pd.to_numeric(df["TotalReviewCount"], errors="coerce").fillna(0).astype(int)
+            df = df[df["ReviewText"].fillna("").str.len() > 5]
+            df = df[ReviewFilteringHelper.english_mask(df["ReviewText"], workers=1)]
+            df = df.drop_duplicates(subset=["ReviewText"])
+            df["PlayHours"] = ReviewFilteringHelper.parse_hours_column(df["PlayHours_Text"])
+            df["DatePosted"] = ReviewFilteringHelper.clean_date_column(df["DatePosted"], today=today)
+            return df.drop(columns=["PlayHours_Text", *UNUSED_RAW_COLUMNS])
+
+        def single_pass():
+            df = read_reviews(path, columns=is_used_raw_column, sep=";")
+            return ReviewFilteringHelper.clean_reviews(df, language_workers=1, today=today)
+
+        results = {}
+        for name, run in (("Chained filters", chained), ("Single mask + usecols", single_pass)):
+            tracemalloc.start()
+            start = perf_counter()
+            df = run()
+            elapsed = perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = df
+            print(f"{name}: peak {peak / 2**20:.1f} MB, {elapsed:.2f}s")
+            del df
+
+    chained_df, single_df = results.values()
+    print(f"Identical output: {chained_df.reset_index(drop=True).equals(single_df.reset_index(drop=True))}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Filter and enrich scraped Steam reviews")
+    parser.add_argument("--input", default=RAW_REVIEWS_PATH,
+                        help="Raw reviews written by the scraper (';'-separated CSV or a columnar sibling)")
+    parser.add_argument("--output", default=CLEANED_REVIEWS_PATH,
+                        help="Cleaned reviews (the extension follows --format)")
+    parser.add_argument("--input-format", choices=["csv", "parquet", "feather"], default=None,
+                        help="Format of the raw reviews (default: newest of CSV and columnar files)")
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv",
+                        help="Output format of the cleaned reviews")
+    parser.add_argument("--skip-dedupe", action="store_true",
+                        help="Skip the full-text dedupe (raw file was scraped with the digest dedupe index)")
+    parser.add_argument("--language-workers", type=int, default=None,
+                        help="Processes for language detection (default: one per CPU, 1 = in-process)")
+    parser.add_argument("--language-cache", default=LANGUAGE_CACHE_PATH,
+                        help="sqlite file memoizing detected languages by text digest")
+    parser.add_argument("--no-language-cache", action="store_true",
+                        help="Detect every ambiguous text again instead of using the cache")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="Load reviews with default pandas dtypes instead of the compact layout")
+    parser.add_argument("--arrow-strings", action="store_true",
+                        help="Hold review text as pyarrow-backed strings (needs pyarrow)")
+    parser.add_argument("--metadata-cache", default=METADATA_CACHE_PATH,
+                        help="sqlite file caching Steam store / SteamSpy responses")
+    parser.add_argument("--metadata-ttl", type=float, default=METADATA_TTL_HOURS,
+                        help="Hours before cached metadata is fetched again")
+    metadata_mode = parser.add_mutually_exclusive_group()
+    metadata_mode.add_argument("--refresh-metadata", action="store_true",
+                               help="Ignore the metadata cache and fetch everything again")
+    metadata_mode.add_argument("--offline", action="store_true",
+                               help="Use only cached metadata (stale entries included), no network")
+    parser.add_argument("--metadata-workers", type=int, default=METADATA_WORKERS,
+                        help="Concurrent metadata requests (still rate limited per host)")
+    parser.add_argument("--strict-metadata", action="store_true",
+                        help="Exit with an error if metadata for any game could not be fetched")
+    run_mode = parser.add_mutually_exclusive_group()
+    run_mode.add_argument("--chunksize", type=int, nargs="?", const=STREAM_CHUNK_SIZE, default=None,
+                          help=f"Stream the raw reviews in chunks of this many rows (default {STREAM_CHUNK_SIZE}) "
+                               "instead of loading the whole file")
+    run_mode.add_argument("--incremental", action="store_true",
+                          help="Only process raw rows that are new or changed since the last incremental run "
+                               "and merge them into the existing output")
+    parser.add_argument("--manifest", default=None,
+                        help=f"Manifest of processed rows for --incremental (default: <output>{MANIFEST_SUFFIX})")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Benchmark row-wise vs vectorized parsing on synthetic data and exit")
+    parser.add_argument("--memory-benchmark", action="store_true",
+                        help="Benchmark peak memory of chained vs single-pass filtering on synthetic data and exit")
+    parser.add_argument("--benchmark-rows", type=int, default=1_000_000,
+                        help="Rows in the synthetic benchmark frame")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.benchmark:
+        benchmark_parsing(args.benchmark_rows)
+        return
+    if args.memory_benchmark:
+        benchmark_memory(args.benchmark_rows)
+        return
+
+    language_cache = None if args.no_language_cache else args.language_cache
+    if not args.chunksize and not args.incremental:
+        review_df = ReviewFilteringHelper.preprocess(
+            args.input,
+            input_format=args.input_format,
+            dedupe=not args.skip_dedupe,
+            language_workers=args.language_workers,
+            language_cache=language_cache,
+            compact=not args.no_compact,
+            arrow_strings=args.arrow_strings,
         )
-        df.to_csv("steam_reviews_cleaned.csv", index=False)
 
+    # Metadata is only needed for the enrichment step, so it is loaded as late as possible
+    game_metadata, failed_apps = load_game_metadata(
+        args.metadata_cache,
+        ttl_hours=args.metadata_ttl,
+        refresh=args.refresh_metadata,
+        offline=args.offline,
+        workers=args.metadata_workers,
+    )
+    print(f"Fetched metadata for {len(game_metadata)}/{len(game_appids)} games")
+    if failed_apps:
+        print(f"Metadata failed for {len(failed_apps)} games:")
+        for appid, error in failed_apps.items():
+            print(f"  {appid}: {error}")
+        if args.strict_metadata:
+            raise SystemExit(1)
+
+    if args.incremental:
+        preprocess_incremental(
+            game_metadata,
+            input_path=args.input,
+            output_path=args.output,
+            manifest_path=args.manifest,
+            input_format=args.input_format,
+            output_format=args.format,
+            dedupe=not args.skip_dedupe,
+            language_workers=args.language_workers,
+            language_cache=language_cache,
+            compact=not args.no_compact,
+            arrow_strings=args.arrow_strings,
+        )
+    elif args.chunksize:
+        preprocess_streaming(
+            game_metadata,
+            input_path=args.input,
+            output_path=args.output,
+            chunksize=args.chunksize,
+            input_format=args.input_format,
+            output_format=args.format,
+            dedupe=not args.skip_dedupe,
+            language_workers=args.language_workers,
+            language_cache=language_cache,
+            compact=not args.no_compact,
+            arrow_strings=args.arrow_strings,
+        )
+    else:
+        ReviewMetadataHelper.create_preprocess_dataset(
+            review_df, game_metadata, output_path=args.output, output_format=args.format
+        )
 
-meta_df = GameMetadataHelper.build_metadata_dataset()
-game_metadata = meta_df.set_index("appid").to_dict(orient="index")
 
-review_df = ReviewFilteringHelper.preprocess()
-ReviewMetadataHelper.create_preprocess_dataset(review_df)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
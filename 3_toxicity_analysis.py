@@ -1,33 +1,619 @@
+import argparse
+import heapq
+import multiprocessing
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
 from tqdm import tqdm
-import pandas as pd
+import numpy as np
 from detoxify import Detoxify
 
-def analyze_csv_with_detoxify(path, model_name="original"):
-    df = pd.read_csv(path)
+from checkpoint import JsonCheckpoint, file_fingerprint
+from digest_store import DigestCache
+from review_io import ReviewWriter, format_path, iter_reviews, read_reviews, resolve_input, write_reviews
+from review_text import text_digest
+
+SCORE_KEYS = ["toxicity", "severe_toxicity", "obscene", "threat", "insult", "identity_attack"]
+# Token-budget batching: reviews are sorted by token length and packed so that
+# batch size x longest review (the padded batch) stays within MAX_BATCH_TOKENS
+MAX_BATCH_TOKENS = 16384
+MAX_BATCH_SIZE = 256
+# Previous fixed batching, kept as the benchmark baseline
+FIXED_BATCH_SIZE = 128
+# --workers: each worker gets several shards so faster workers pick up more work
+SHARDS_PER_WORKER = 4
+# Streaming mode (--chunksize): reviews per chunk, and the checkpoint / part
+# files kept next to the output until the run finishes
+STREAM_CHUNK_SIZE = 50_000
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+PARTS_SUFFIX = ".parts"
+# Scores memoized by model and text digest, so reruns only score new texts
+SCORE_CACHE_PATH = "steam_reviews_toxicity.sqlite"
+# Inference backends (--backend): the reference PyTorch model, the same model
+# with dynamically int8-quantized Linear layers, and an exported ONNX graph
+# run with ONNX Runtime in float32 or with int8 weights
+BACKENDS = ("torch", "quantized", "onnx", "onnx-int8")
+ONNX_BACKENDS = ("onnx", "onnx-int8")
+ONNX_MODEL_DIR = "detoxify_onnx"
+ONNX_OPSET = 17
+# --parity-check: largest absolute score drift from the torch backend allowed per backend
+PARITY_TOLERANCES = {"quantized": 0.05, "onnx": 1e-4, "onnx-int8": 0.05}
+
+# Model of a worker process (see init_worker)
+_worker_model = None
+
+def token_lengths(model, reviews):
+    """Token count of every review as the model sees it (truncated, special tokens included)"""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        # Rough estimate for models without an exposed tokenizer
+        return np.array([len(review) // 4 + 2 for review in reviews])
+    return np.array([len(ids) for ids in tokenizer(reviews, truncation=True)["input_ids"]])
+
+def length_bucketed_batches(lengths, max_tokens=MAX_BATCH_TOKENS, max_batch_size=MAX_BATCH_SIZE):
+    """Split review indices into batches of similar length within the padded-token budget"""
+    batches = []
+    batch = []
+    for index in np.argsort(lengths, kind="stable"):
+        # Sorted ascending, so the new review is the longest in the batch
+        padded = max(int(lengths[index]), 1) * (len(batch) + 1)
+        if batch and (padded > max_tokens or len(batch) == max_batch_size):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+def fixed_batches(count, batch_size=FIXED_BATCH_SIZE):
+    """Batches of batch_size reviews in file order"""
+    return [list(range(start, min(start + batch_size, count))) for start in range(0, count, batch_size)]
+
+def padded_tokens(lengths, batches):
+    return sum(len(batch) * int(max(lengths[i] for i in batch)) for batch in batches)
+
+def score_reviews(model, reviews, batches, desc="Analyzing toxicity", show_progress=True):
+    """Run the model batch by batch and scatter the scores back into review order"""
+    scores = {key: np.zeros(len(reviews)) for key in SCORE_KEYS}
+    with tqdm(total=len(reviews), desc=desc, unit="review", disable=not show_progress) as progress:
+        for batch in batches:
+            batch_scores = model.predict([reviews[i] for i in batch])
+            for key in SCORE_KEYS:
+                scores[key][batch] = batch_scores[key]
+            progress.update(len(batch))
+    return scores
+
+def physical_cores():
+    """Physical core count (psutil when available, else logical CPUs)"""
+    try:
+        import psutil
+    except ImportError:
+        return os.cpu_count() or 1
+    return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+
+def balanced_shards(reviews, shard_count):
+    """Split review indices into shards of similar total length (longest first, greedy)"""
+    lengths = [len(review) for review in reviews]
+    shards = [[] for _ in range(shard_count)]
+    heap = [(0, shard) for shard in range(shard_count)]
+    for index in sorted(range(len(reviews)), key=lengths.__getitem__, reverse=True):
+        load, shard = heapq.heappop(heap)
+        shards[shard].append(index)
+        heapq.heappush(heap, (load + lengths[index] + 1, shard))
+    return [sorted(shard) for shard in shards if shard]
+
+def quantize_model(model):
+    """Dynamic int8 quantization of the transformer's Linear layers (int8 weights, activations quantized per batch)"""
+    import torch
+
+    model.model = torch.ao.quantization.quantize_dynamic(model.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+def onnx_model_path(model_name, backend):
+    suffix = "-int8" if backend == "onnx-int8" else ""
+    return os.path.join(ONNX_MODEL_DIR, re.sub(r"\W", "_", model_name) + suffix + ".onnx")
+
+def export_onnx(model_name, backend):
+    """
+    Export the Detoxify transformer to an ONNX graph with dynamic batch and
+    sequence axes (once; later runs reuse the file). onnx-int8 additionally
+    quantizes the graph's weights to int8 with ONNX Runtime.
+    """
+    path = onnx_model_path(model_name, backend)
+    if os.path.exists(path):
+        return path
+    os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    if backend == "onnx-int8":
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(export_onnx(model_name, "onnx"), tmp_path, weight_type=QuantType.QInt8)
+    else:
+        import torch
+
+        reference = Detoxify(model_name)
+        sample = reference.tokenizer(["This game is great"], return_tensors="pt")
+        # Positional order of the transformers forward() for BERT and (XLM-)RoBERTa
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+        with torch.no_grad():
+            torch.onnx.export(
+                reference.model.eval(),
+                tuple(sample[name] for name in input_names),
+                tmp_path,
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=ONNX_OPSET,
+            )
+    os.replace(tmp_path, path)
+    print(f"Exported {model_name} model for the {backend} backend to {path}")
+    return path
+
+class OnnxDetoxify:
+    """
+    Detoxify model exported to ONNX (export_onnx) and run with ONNX Runtime on
+    CPU. predict() returns the same {score name: scores} dict as
+    Detoxify.predict, and the tokenizer is the Detoxify one.
+    """
+
+    def __init__(self, model_name, backend="onnx", threads=None):
+        import onnxruntime as ort
+
+        path = export_onnx(model_name, backend)
+        # Only the tokenizer and score names are kept from the PyTorch model
+        reference = Detoxify(model_name)
+        self.tokenizer = reference.tokenizer
+        self.class_names = reference.class_names
+        del reference
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [graph_input.name for graph_input in self.session.get_inputs()]
+
+    def predict(self, text):
+        texts = [text] if isinstance(text, str) else list(text)
+        inputs = self.tokenizer(texts, return_tensors="np", truncation=True, padding=True)
+        logits = self.session.run(None, {name: inputs[name].astype(np.int64) for name in self.input_names})[0]
+        scores = 1 / (1 + np.exp(-logits))
+        if isinstance(text, str):
+            return {name: float(scores[0][i]) for i, name in enumerate(self.class_names)}
+        return {name: scores[:, i].tolist() for i, name in enumerate(self.class_names)}
+
+def load_model(model_name, backend="torch", threads=None):
+    """Detoxify model on the given inference backend (see BACKENDS); all share Detoxify's predict()"""
+    if backend in ONNX_BACKENDS:
+        return OnnxDetoxify(model_name, backend, threads)
     model = Detoxify(model_name)
-    reviews = df["ReviewText"].astype(str).tolist()
-    # Divide reviews into batches to avoid memory issues
-    batch_size = 128
-    scores = {
-        "toxicity": [],
-        "severe_toxicity": [],
-        "obscene": [],
-        "threat": [],
-        "insult": [],
-        "identity_attack": []
-    }
-    for i in tqdm(range(0, len(reviews), batch_size), desc="Analyzing toxicity"):
-        batch_reviews = reviews[i:i+batch_size]
-        batch_scores = model.predict(batch_reviews)
-        for key in scores:
-            scores[key].extend(batch_scores[key])
+    return quantize_model(model) if backend == "quantized" else model
+
+def init_worker(model_name, threads, backend="torch"):
+    """Worker initializer: cap torch intra-op threads, then load the model once"""
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(threads)
+    _worker_model = load_model(model_name, backend, threads)
+
+def score_shard(reviews, max_tokens):
+    batches = length_bucketed_batches(token_lengths(_worker_model, reviews), max_tokens)
+    return score_reviews(_worker_model, reviews, batches, show_progress=False)
+
+def worker_pool(model_name, workers, threads_per_worker=None, backend="torch"):
+    """
+    Pool of worker processes, each with its own model and
+    physical_cores() // workers torch / ONNX Runtime threads
+    """
+    threads = threads_per_worker or max(1, physical_cores() // workers)
+    if backend in ONNX_BACKENDS:
+        # Export once here rather than racing in every worker
+        export_onnx(model_name, backend)
+    print(f"Scoring with {workers} workers x {threads} threads ({backend} backend)")
+    # spawn: forking a process that has already loaded torch can deadlock its thread pools
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                               initargs=(model_name, threads, backend))
+
+def score_reviews_parallel(reviews, executor, workers, max_tokens=MAX_BATCH_TOKENS, desc="Analyzing toxicity"):
+    """Score reviews on a worker_pool; shards are merged back into review order as they finish"""
+    shards = balanced_shards(reviews, workers * SHARDS_PER_WORKER)
+    scores = {key: np.zeros(len(reviews)) for key in SCORE_KEYS}
+    with tqdm(total=len(reviews), desc=desc, unit="review") as progress:
+        futures = {
+            executor.submit(score_shard, [reviews[i] for i in shard], max_tokens): shard
+            for shard in shards
+        }
+        for future in as_completed(futures):
+            shard = futures[future]
+            shard_scores = future.result()
+            for key in SCORE_KEYS:
+                scores[key][shard] = shard_scores[key]
+            progress.update(len(shard))
+    return scores
+
+def open_score_cache(path, model_name, backend="torch"):
+    """
+    Score cache of a model in the sqlite file at path, or None without a path.
+    Every model and backend gets its own table since quantized scores differ
+    slightly from the reference ones.
+    """
+    if not path:
+        return None
+    table = model_name if backend == "torch" else f"{model_name}_{backend}"
+    return DigestCache(path, table="toxicity_" + re.sub(r"\W", "_", table))
+
+def add_scores(df, model=None, executor=None, workers=1, max_tokens=MAX_BATCH_TOKENS, cache=None,
+               desc="Analyzing toxicity"):
+    """
+    Score the ReviewText of df in-process (model) or on a worker_pool
+    (executor) and add the score columns. Each distinct text (by digest of the
+    normalized text) is scored once; with a cache, texts scored on earlier
+    runs are looked up and only the misses go to the model.
+    """
+    texts = df["ReviewText"].astype(str)
+    digests = texts.map(text_digest)
+    unique_texts = dict(zip(digests, texts))
+    cached = cache.get_many(unique_texts) if cache is not None else {}
+    misses = [digest for digest in unique_texts if digest not in cached]
+    reviews = [unique_texts[digest] for digest in misses]
+
+    if not reviews:
+        scores = {key: np.zeros(0) for key in SCORE_KEYS}
+    elif executor is not None:
+        scores = score_reviews_parallel(reviews, executor, workers, max_tokens, desc=desc)
+    else:
+        # Length-bucketed batches keep padding (and memory) per batch bounded
+        batches = length_bucketed_batches(token_lengths(model, reviews), max_tokens)
+        scores = score_reviews(model, reviews, batches, desc=desc)
+    scored = dict(zip(misses, np.column_stack([scores[key] for key in SCORE_KEYS]).tolist()))
+    if cache is not None and scored:
+        cache.put_many(scored.items())
+    hit_rate = len(cached) / len(unique_texts) if unique_texts else 0
+    print(f"Scores: {len(df)} reviews, {len(unique_texts)} distinct texts, {len(cached)} cached "
+          f"({hit_rate:.1%} hit rate), {len(scored)} scored")
 
     # Add scores to dataframe
-    for key in scores:
-        df[key] = scores[key]
+    values = np.array(digests.map({**cached, **scored}).tolist(), dtype=float).reshape(len(df), len(SCORE_KEYS))
+    for column, key in enumerate(SCORE_KEYS):
+        df[key] = values[:, column]
     return df
 
-if __name__ == "__main__":
-    df = analyze_csv_with_detoxify('steam_reviews_cleaned.csv')
-    df.to_csv('steam_reviews_with_toxicity.csv', index=False)
+def analyze_csv_with_detoxify(path, model_name="original", input_format=None, compact=True, arrow_strings=False,
+                              max_tokens=MAX_BATCH_TOKENS, workers=1, threads_per_worker=None,
+                              score_cache=SCORE_CACHE_PATH, backend="torch"):
+    df = read_reviews(path, fmt=input_format, compact=compact, arrow_strings=arrow_strings)
+    cache = open_score_cache(score_cache, model_name, backend)
+    try:
+        if workers > 1:
+            with worker_pool(model_name, workers, threads_per_worker, backend) as executor:
+                return add_scores(df, executor=executor, workers=workers, max_tokens=max_tokens, cache=cache)
+        return add_scores(df, model=load_model(model_name, backend), max_tokens=max_tokens, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+
+class ScoringCheckpoint(JsonCheckpoint):
+    """
+    Progress record of a streaming run so that --resume can continue after a
+    crash: the input (path, size and mtime) and chunk size the run was started
+    with, the chunks and reviews already scored and the CSV output size after
+    the last finished chunk.
+    """
+
+    @classmethod
+    def start(cls, path, input_path, chunksize):
+        return cls(path, {
+            "input": input_path,
+            "input_fingerprint": file_fingerprint(input_path),
+            "chunksize": chunksize,
+            "chunks_done": 0,
+            "rows_done": 0,
+            "output_offset": 0,
+        })
+
+    @property
+    def chunks_done(self):
+        return self.state["chunks_done"]
+
+    @property
+    def rows_done(self):
+        return self.state["rows_done"]
+
+    @property
+    def output_offset(self):
+        return self.state["output_offset"]
+
+    def mismatch(self, input_path, chunksize):
+        """Why this checkpoint cannot continue a run over input_path in chunks of chunksize, or None"""
+        if self.state["input"] != input_path:
+            return f"it was written for {self.state['input']}"
+        if self.state["chunksize"] != chunksize:
+            return f"it was written with --chunksize {self.state['chunksize']}"
+        if self.state.get("input_fingerprint") != file_fingerprint(input_path):
+            return f"{input_path} changed since the interrupted run"
+        return None
+
+    def save(self, chunks_done, rows_done, output_offset=0):
+        super().save(chunks_done=chunks_done, rows_done=rows_done, output_offset=output_offset)
+
+def part_path(parts_dir, index, fmt):
+    return format_path(os.path.join(parts_dir, f"part-{index:05d}"), fmt)
+
+def load_checkpoint(checkpoint_path, input_path, chunksize, output_file, parts_dir, output_format):
+    """
+    Checkpoint of an interrupted run that can be continued, or None if there is
+    none or its output is missing. Raises RuntimeError if the checkpoint was
+    written for another input or chunk size, or the input changed since, so
+    chunks of different inputs are never mixed in one output.
+    """
+    checkpoint = ScoringCheckpoint.load(checkpoint_path)
+    if checkpoint is None:
+        print(f"No checkpoint found at {checkpoint_path}; starting a fresh run")
+        return None
+    reason = checkpoint.mismatch(input_path, chunksize)
+    if reason is not None:
+        raise RuntimeError(
+            f"Cannot resume from {checkpoint_path}: {reason}. Run without --resume to score the input from scratch."
+        )
+    if output_format == "csv" and not os.path.exists(output_file):
+        print(f"Output {output_file} is missing; ignoring checkpoint {checkpoint_path}")
+    elif output_format != "csv" and not all(
+            os.path.exists(part_path(parts_dir, index, output_format)) for index in range(checkpoint.chunks_done)):
+        print(f"Chunk files in {parts_dir} are missing; ignoring checkpoint {checkpoint_path}")
+    else:
+        print(f"Resuming from {checkpoint_path}: {checkpoint.chunks_done} chunks "
+              f"({checkpoint.rows_done} reviews) already scored")
+        return checkpoint
+    return None
 
+def analyze_streaming(path, output_path, model_name="original", input_format=None, output_format="csv",
+                      chunksize=STREAM_CHUNK_SIZE, resume=False, compact=True, arrow_strings=False,
+                      max_tokens=MAX_BATCH_TOKENS, workers=1, threads_per_worker=None, score_cache=SCORE_CACHE_PATH,
+                      backend="torch"):
+    """
+    Score the input chunk by chunk and write every scored chunk out as soon as
+    it is done, so memory is bounded by the chunk size instead of the corpus.
+    CSV output is appended to; Parquet / feather chunks go to part files next
+    to the output that are merged into it at the end. A checkpoint is saved
+    after every chunk; with resume=True the chunks it records are skipped.
+    """
+    input_path, input_format = resolve_input(path, input_format)
+    output_file = format_path(output_path, output_format)
+    parts_dir = output_file + PARTS_SUFFIX
+    checkpoint_path = output_file + CHECKPOINT_SUFFIX
+    checkpoint = None
+    if resume:
+        checkpoint = load_checkpoint(checkpoint_path, input_path, chunksize, output_file, parts_dir, output_format)
+    if checkpoint is None:
+        checkpoint = ScoringCheckpoint.start(checkpoint_path, input_path, chunksize)
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    elif output_format == "csv":
+        # Drop any rows written after the last checkpoint
+        with open(output_file, "r+b") as raw:
+            raw.truncate(checkpoint.output_offset)
+    if output_format != "csv":
+        os.makedirs(parts_dir, exist_ok=True)
+
+    model = load_model(model_name, backend) if workers == 1 else None
+    executor = worker_pool(model_name, workers, threads_per_worker, backend) if workers > 1 else None
+    cache = open_score_cache(score_cache, model_name, backend)
+    chunks_done, rows_done = checkpoint.chunks_done, checkpoint.rows_done
+    try:
+        writer = ReviewWriter(output_file, append=True) if output_format == "csv" else None
+        chunks = iter_reviews(input_path, chunksize, fmt=input_format, compact=compact, arrow_strings=arrow_strings)
+        for index, chunk in enumerate(chunks):
+            if index < chunks_done:
+                continue
+            chunk = add_scores(chunk, model=model, executor=executor, workers=workers, max_tokens=max_tokens,
+                               cache=cache, desc=f"Chunk {index + 1}")
+            if writer is not None:
+                writer.write(chunk)
+                output_offset = os.path.getsize(output_file)
+            else:
+                write_reviews(chunk, part_path(parts_dir, index, output_format), fmt=output_format)
+                output_offset = 0
+            chunks_done, rows_done = index + 1, rows_done + len(chunk)
+            checkpoint.save(chunks_done, rows_done, output_offset)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if cache is not None:
+            cache.close()
+
+    if output_format != "csv":
+        # Merge the part files one chunk at a time
+        with ReviewWriter(output_file, fmt=output_format) as merged:
+            for index in range(chunks_done):
+                for df in iter_reviews(part_path(parts_dir, index, output_format), chunksize, fmt=output_format):
+                    merged.write(df)
+    checkpoint.remove()
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    print(f"Saved {rows_done} scored reviews to {output_file}")
+    return output_file
+
+def sample_reviews(path, input_format=None, rows=2000):
+    """Fixed random sample of review texts from the input"""
+    df = read_reviews(path, fmt=input_format, columns=["ReviewText"])
+    sample = df["ReviewText"].dropna().astype(str)
+    return sample.sample(min(rows, len(sample)), random_state=0).tolist()
+
+def benchmark_batching(path, model_name="original", input_format=None, rows=2000, max_tokens=MAX_BATCH_TOKENS,
+                       workers=1, threads_per_worker=None, backend="torch"):
+    """
+    Compare throughput of fixed 128-review batches with token-budget batches
+    on a sample of the input, and with token-budget batches on workers > 1
+    processes (including their startup).
+    """
+    reviews = sample_reviews(path, input_format, rows)
+    model = load_model(model_name, backend)
+    lengths = token_lengths(model, reviews)
+    print(f"Benchmarking {len(reviews)} reviews (tokens: median {int(np.median(lengths))}, max {lengths.max()})")
+
+    results = {}
+    for name in ("Fixed batches", "Token-budget batches"):
+        start = perf_counter()
+        if name == "Fixed batches":
+            batches = fixed_batches(len(reviews))
+        else:
+            batches = length_bucketed_batches(token_lengths(model, reviews), max_tokens)
+        results[name] = score_reviews(model, reviews, batches, desc=name)
+        elapsed = perf_counter() - start
+        print(f"{name}: {len(batches)} batches, {padded_tokens(lengths, batches)} padded tokens, "
+              f"{elapsed:.1f}s, {len(reviews) / elapsed:.1f} reviews/s")
+
+    if workers > 1:
+        start = perf_counter()
+        with worker_pool(model_name, workers, threads_per_worker, backend) as executor:
+            results["Parallel"] = score_reviews_parallel(reviews, executor, workers, max_tokens)
+        elapsed = perf_counter() - start
+        print(f"Token-budget batches on {workers} workers: {elapsed:.1f}s, {len(reviews) / elapsed:.1f} reviews/s")
+
+    fixed, *others = results.values()
+    max_diff = max(np.abs(fixed[key] - other[key]).max() for other in others for key in SCORE_KEYS)
+    print(f"Max score difference: {max_diff:.2e}")
+
+def parity_check(path, model_name="original", backend="quantized", input_format=None, rows=2000,
+                 max_tokens=MAX_BATCH_TOKENS, tolerance=None):
+    """
+    Score a sample of the input with the reference PyTorch model and with the
+    given backend, and report throughput and score drift per score. Returns
+    True if the largest absolute drift is within tolerance (default
+    PARITY_TOLERANCES[backend]).
+    """
+    tolerance = PARITY_TOLERANCES[backend] if tolerance is None else tolerance
+    reviews = sample_reviews(path, input_format, rows)
+    print(f"Parity check of the {backend} backend against torch on {len(reviews)} reviews")
+
+    results = {}
+    for name in ("torch", backend):
+        model = load_model(model_name, name)
+        start = perf_counter()
+        batches = length_bucketed_batches(token_lengths(model, reviews), max_tokens)
+        results[name] = score_reviews(model, reviews, batches, desc=name)
+        elapsed = perf_counter() - start
+        print(f"{name}: {elapsed:.1f}s, {len(reviews) / elapsed:.1f} reviews/s")
+        del model
+
+    reference, candidate = results["torch"], results[backend]
+    max_drift = 0.0
+    for key in SCORE_KEYS:
+        drift = np.abs(reference[key] - candidate[key])
+        agreement = np.mean((reference[key] > 0.5) == (candidate[key] > 0.5))
+        print(f"{key}: max drift {drift.max():.2e}, mean drift {drift.mean():.2e}, "
+              f"{agreement:.2%} same side of 0.5")
+        max_drift = max(max_drift, float(drift.max()))
+    passed = max_drift <= tolerance
+    print(f"Parity {'passed' if passed else 'FAILED'}: max drift {max_drift:.2e}, tolerance {tolerance:.0e}")
+    return passed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score review toxicity with Detoxify")
+    parser.add_argument("--input", default="steam_reviews_cleaned.csv", help="Cleaned reviews file")
+    parser.add_argument("--output", default="steam_reviews_with_toxicity.csv", help="Scored reviews file")
+    parser.add_argument("--model", default="original", help="Detoxify model name")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch",
+                        help="Inference backend: PyTorch, int8-quantized PyTorch, ONNX Runtime or int8 ONNX Runtime")
+    parser.add_argument("--input-format", choices=["csv", "parquet", "feather"], default=None,
+                        help="Format of the input (default: newest of CSV and columnar files)")
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv",
+                        help="Output format")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="Load reviews with default pandas dtypes instead of the compact layout")
+    parser.add_argument("--arrow-strings", action="store_true",
+                        help="Hold review text as pyarrow-backed strings (needs pyarrow)")
+    parser.add_argument("--max-batch-tokens", type=int, default=MAX_BATCH_TOKENS,
+                        help="Padded tokens per inference batch (batch size x longest review)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes, each with its own model (default 1 = in-process)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="torch threads per worker (default: physical cores / workers)")
+    parser.add_argument("--score-cache", default=SCORE_CACHE_PATH,
+                        help="sqlite file memoizing scores by model and text digest")
+    parser.add_argument("--no-score-cache", action="store_true",
+                        help="Score every review again instead of using the cache")
+    parser.add_argument("--chunksize", type=int, nargs="?", const=STREAM_CHUNK_SIZE, default=None,
+                        help=f"Stream the input in chunks of this many reviews (default {STREAM_CHUNK_SIZE}), "
+                             "writing each scored chunk as it finishes")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted --chunksize run from its checkpoint")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare fixed and token-budget batching on a sample of the input and exit")
+    parser.add_argument("--benchmark-rows", type=int, default=2000,
+                        help="Reviews sampled for the benchmark and the parity check")
+    parser.add_argument("--parity-check", action="store_true",
+                        help="Compare --backend against the torch backend on a sample of the input and exit "
+                             "(exit status 1 if the score drift exceeds the tolerance)")
+    parser.add_argument("--parity-tolerance", type=float, default=None,
+                        help="Largest absolute score drift allowed by --parity-check (default: per backend)")
+    args = parser.parse_args()
+    if args.parity_check and args.backend == "torch":
+        parser.error("--parity-check compares --backend against torch; choose another backend")
+    if args.resume and not args.chunksize:
+        parser.error("--resume needs --chunksize: only streaming runs are checkpointed")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    score_cache = None if args.no_score_cache else args.score_cache
+    if args.parity_check:
+        passed = parity_check(
+            args.input,
+            model_name=args.model,
+            backend=args.backend,
+            input_format=args.input_format,
+            rows=args.benchmark_rows,
+            max_tokens=args.max_batch_tokens,
+            tolerance=args.parity_tolerance,
+        )
+        if not passed:
+            raise SystemExit(1)
+    elif args.benchmark:
+        benchmark_batching(
+            args.input,
+            model_name=args.model,
+            input_format=args.input_format,
+            rows=args.benchmark_rows,
+            max_tokens=args.max_batch_tokens,
+            workers=args.workers,
+            threads_per_worker=args.threads_per_worker,
+            backend=args.backend,
+        )
+    elif args.chunksize:
+        analyze_streaming(
+            args.input,
+            args.output,
+            model_name=args.model,
+            input_format=args.input_format,
+            output_format=args.format,
+            chunksize=args.chunksize,
+            resume=args.resume,
+            compact=not args.no_compact,
+            arrow_strings=args.arrow_strings,
+            max_tokens=args.max_batch_tokens,
+            workers=args.workers,
+            threads_per_worker=args.threads_per_worker,
+            backend=args.backend,
+            score_cache=score_cache,
+        )
+    else:
+        df = analyze_csv_with_detoxify(
+            args.input,
+            model_name=args.model,
+            input_format=args.input_format,
+            compact=not args.no_compact,
+            arrow_strings=args.arrow_strings,
+            max_tokens=args.max_batch_tokens,
+            workers=args.workers,
+            threads_per_worker=args.threads_per_worker,
+            backend=args.backend,
+            score_cache=score_cache,
+        )
+        write_reviews(df, args.output, fmt=args.format)
@@ -1,3 +1,4 @@
+import argparse
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -7,6 +8,8 @@ from wordcloud import WordCloud
 from scipy.stats import kruskal, mannwhitneyu
 import scikit_posthocs as sp
 
+from review_io import read_reviews
+
 GENRES = ['FPS', 'RPG', 'Indie', 'Strategy', 'Simulation', 'MOBA', 'Co-op / Multiplayer']
 POPULARITY_BUCKETS = ['Low', 'Medium', 'High', 'Very High']
 
@@ -14,6 +17,9 @@ def process_df(df):
     # Remove Specific Game ID
     df = df[df["GameId"] != 3606480]
     df = df.dropna(subset=['toxicity'])
+    # Columnar inputs load groups as categoricals; keep only groups that still have rows
+    for column in df.select_dtypes(include="category").columns:
+        df[column] = df[column].cat.remove_unused_categories()
     return df
 
 def print_header(title):
@@ -270,8 +276,20 @@ def plot_toxicity_binned_by_recommendation(df, bin_size=0.2):
     plt.tight_layout()
     plt.show()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Statistical analysis of review toxicity")
+    parser.add_argument("--input", default="steam_reviews_with_toxicity.csv", help="Scored reviews file")
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default=None,
+                        help="Input format (default: newest of CSV and columnar files)")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="Load reviews with default pandas dtypes instead of the compact layout")
+    parser.add_argument("--arrow-strings", action="store_true",
+                        help="Hold review text as pyarrow-backed strings (needs pyarrow)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    df = pd.read_csv('steam_reviews_with_toxicity.csv')
+    args = parse_args()
+    df = read_reviews(args.input, fmt=args.format, compact=not args.no_compact, arrow_strings=args.arrow_strings)
     df = process_df(df)
 
     describe_across_genres(df)
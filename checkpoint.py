@@ -0,0 +1,51 @@
+"""
+JSON progress records that let long pipeline runs (scraping, toxicity
+scoring) continue with --resume after a crash.
+"""
+
+import json
+import os
+
+
+def file_fingerprint(path):
+    """Size and modification time of a file, to notice that it changed between runs"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class JsonCheckpoint:
+    """
+    Progress record of a run, kept as a JSON file next to its output.
+    Subclasses provide the initial state and accessors for their fields.
+
+    Save only after the output the state describes is on disk: the JSON is
+    written to a temporary file and then moved over the checkpoint, so a crash
+    never leaves a half-written one.
+    """
+
+    def __init__(self, path, state=None):
+        self.path = path
+        self.state = state if state is not None else self.initial_state()
+
+    def initial_state(self):
+        return {}
+
+    @classmethod
+    def load(cls, path):
+        """Load a checkpoint file, or return None if it does not exist"""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(path, json.load(f))
+
+    def save(self, **fields):
+        """Update the given state fields and write the checkpoint"""
+        self.state.update(fields)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
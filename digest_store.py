@@ -0,0 +1,134 @@
+"""
+Compact on-disk stores keyed by review text digests (see review_text).
+Backed by sqlite in WAL mode so several threads, processes and runs can
+share one file.
+"""
+
+import json
+import sqlite3
+import threading
+
+
+class DigestIndex:
+    """
+    Persistent set of digests. add() returns False for digests that are
+    already present, which makes it a dedupe filter shared across workers and
+    runs. path=':memory:' gives a private, non-persistent set.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS digests (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._conn.commit()
+
+    def add(self, digest):
+        """Insert a digest; return True if it was new"""
+        with self._lock:
+            cursor = self._conn.execute("INSERT OR IGNORE INTO digests (digest) VALUES (?)", (digest,))
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def add_many(self, digests):
+        """Insert digests in one transaction; return a list of booleans (True = new)"""
+        added = []
+        with self._lock:
+            for digest in digests:
+                cursor = self._conn.execute("INSERT OR IGNORE INTO digests (digest) VALUES (?)", (digest,))
+                added.append(cursor.rowcount == 1)
+            self._conn.commit()
+        return added
+
+    def __contains__(self, digest):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM digests WHERE digest = ?", (digest,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM digests")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DigestCache:
+    """
+    Persistent digest -> value map for memoizing per-text results (language,
+    scores). Values are stored as JSON. Each kind of result lives in its own
+    table, so several caches can share one file.
+    """
+
+    def __init__(self, path=":memory:", table="cache"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (digest BLOB PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get_many(self, digests, batch_size=500):
+        """Return {digest: value} for the digests that are cached"""
+        digests = list(digests)
+        found = {}
+        with self._lock:
+            for start in range(0, len(digests), batch_size):
+                batch = digests[start:start + batch_size]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT digest, value FROM {self.table} WHERE digest IN ({placeholders})", batch
+                )
+                for digest, value in rows:
+                    found[digest] = json.loads(value)
+        return found
+
+    def put_many(self, items):
+        """Store (digest, value) pairs in one transaction"""
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (digest, value) VALUES (?, ?)",
+                ((digest, json.dumps(value)) for digest, value in items),
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
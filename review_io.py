@@ -0,0 +1,300 @@
+"""
+Review table storage shared by the pipeline stages.
+Reads and writes review tables as CSV or as columnar Parquet / Arrow IPC
+(feather) files with an explicit column schema, whole or in chunks.
+"""
+
+import os
+
+import pandas as pd
+
+
+FORMAT_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+COLUMNAR_FORMATS = ("parquet", "feather")
+
+# Explicit dtypes for known review columns. Columns not listed (free text such
+# as ReviewText, PlayHours_Text, DatePosted, StoreTags) are kept as strings.
+REVIEW_DTYPES = {
+    "GlobalReviewId": "int64",
+    "GameId": "int64",
+    "GameName": "category",
+    "Genre": "category",
+    "Sentiment": "category",
+    "ReviewLength_Chars": "int64",
+    "ReviewLength_Words": "int64",
+    "IsRecommended": "boolean",
+    "HelpfulVotes": "int64",
+    "PlayHours_Numeric": "float64",
+    "PlayHours": "float64",
+    "OverallReviewSummary": "category",
+    "TotalReviewCount": "Int64",
+    "popularity_bucket": "category",
+    "release_phase": "category",
+    "toxicity": "float64",
+    "severe_toxicity": "float64",
+    "obscene": "float64",
+    "threat": "float64",
+    "insult": "float64",
+    "identity_attack": "float64",
+}
+
+# Compact in-memory layout (compact_reviews): repeated labels become
+# categoricals, integers use the smallest type that fits and IsRecommended is
+# a nullable boolean. Floats (play hours, toxicity scores) stay float64 so
+# written values and the statistics in stage 4 are unchanged.
+COMPACT_CATEGORIES = (
+    "GameName", "Genre", "Sentiment", "ReviewLanguage", "DatePosted",
+    "OverallReviewSummary", "StoreTags", "popularity_bucket", "release_phase",
+)
+COMPACT_INTEGERS = (
+    "GlobalReviewId", "GameId", "ReviewLength_Chars", "ReviewLength_Words", "HelpfulVotes", "TotalReviewCount",
+)
+COMPACT_BOOLEANS = ("IsRecommended",)
+# Free text that can be held as pyarrow-backed strings (compact_reviews(arrow_strings=True))
+ARROW_STRING_COLUMNS = ("ReviewText", "PlayHours_Text")
+
+
+def format_path(path, fmt):
+    """Return path with the file extension of the given format"""
+    root, _ = os.path.splitext(path)
+    return root + FORMAT_EXTENSIONS[fmt]
+
+
+def resolve_input(path, fmt=None):
+    """
+    Pick the file to read for a logical review table.
+    With an explicit fmt the matching file is used. Otherwise the newest of the
+    CSV and its columnar siblings wins, preferring columnar files on ties, so a
+    stale Parquet file never shadows a freshly written CSV.
+    """
+    if fmt is not None:
+        return format_path(path, fmt), fmt
+
+    candidates = []
+    for priority, candidate_fmt in enumerate(COLUMNAR_FORMATS + ("csv",)):
+        candidate = format_path(path, candidate_fmt)
+        if os.path.exists(candidate):
+            candidates.append((-os.path.getmtime(candidate), priority, candidate, candidate_fmt))
+    if not candidates:
+        return path, "csv"
+    _, _, chosen, chosen_fmt = min(candidates)
+    return chosen, chosen_fmt
+
+
+def _cast(series, dtype):
+    if dtype in ("int64", "Int64", "float64"):
+        if series.dtype == object:
+            series = series.astype(str).str.replace(",", "", regex=False)
+        series = pd.to_numeric(series, errors="coerce")
+        if dtype == "int64" and series.isna().any():
+            dtype = "Int64"
+    return series.astype(dtype)
+
+
+def apply_review_dtypes(df):
+    """Cast known review columns to the explicit schema in REVIEW_DTYPES"""
+    for column, dtype in REVIEW_DTYPES.items():
+        if column in df.columns and str(df[column].dtype) != dtype:
+            df[column] = _cast(df[column], dtype)
+    return df
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def compact_reviews(df, arrow_strings=False, report=True):
+    """
+    Convert a review frame to the compact layout in place and return it.
+    arrow_strings stores free text as pyarrow-backed strings when pyarrow is
+    installed. report prints the memory usage before and after.
+    """
+    before = memory_mb(df) if report else None
+    for column in COMPACT_CATEGORIES:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    for column in COMPACT_INTEGERS:
+        if column in df.columns and pd.api.types.is_integer_dtype(df[column].dtype):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    for column in COMPACT_BOOLEANS:
+        if column in df.columns and str(df[column].dtype) in ("bool", "object"):
+            df[column] = df[column].astype("boolean")
+    if arrow_strings:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("pyarrow is not installed; keeping free text as Python strings")
+        else:
+            for column in ARROW_STRING_COLUMNS:
+                if column in df.columns:
+                    df[column] = df[column].astype("string[pyarrow]")
+    if report:
+        print(f"Review frame memory: {before:.1f} MB -> {memory_mb(df):.1f} MB ({len(df)} rows)")
+    return df
+
+
+def arrow_schema(columns):
+    """pyarrow schema for the given review columns (categories are stored as plain strings)"""
+    import pyarrow as pa
+
+    arrow_types = {
+        "int64": pa.int64(),
+        "Int64": pa.int64(),
+        "float64": pa.float64(),
+        "boolean": pa.bool_(),
+    }
+    return pa.schema(
+        [(column, arrow_types.get(REVIEW_DTYPES.get(column), pa.string())) for column in columns]
+    )
+
+
+def _select_columns(path, fmt, columns):
+    """Resolve a column predicate (callable) to the matching column names of a columnar file"""
+    if not callable(columns):
+        return columns
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(path).names
+    else:
+        names = pa.ipc.open_file(path).schema.names
+    return [name for name in names if columns(name)]
+
+
+def read_reviews(path, fmt=None, columns=None, sep=",", compact=False, arrow_strings=False):
+    """
+    Read a review table. path names the CSV; a columnar sibling (same name,
+    .parquet/.feather) is read instead when it exists and is at least as new.
+    Only the requested columns are loaded; columns is a list of names or a
+    predicate on the name, like read_csv's usecols. compact converts the
+    frame to the compact layout (see compact_reviews).
+    """
+    path, fmt = resolve_input(path, fmt)
+    if fmt != "csv":
+        columns = _select_columns(path, fmt, columns)
+    if fmt == "parquet":
+        df = apply_review_dtypes(pd.read_parquet(path, columns=columns))
+    elif fmt == "feather":
+        df = apply_review_dtypes(pd.read_feather(path, columns=columns))
+    else:
+        df = pd.read_csv(path, sep=sep, usecols=columns)
+    if fmt != "csv":
+        print(f"Loaded {len(df)} rows from {path}")
+    if compact:
+        df = compact_reviews(df, arrow_strings=arrow_strings)
+    return df
+
+
+def write_reviews(df, path, fmt="csv", sep=","):
+    """Write a review table in the given format; returns the path written"""
+    path = format_path(path, fmt)
+    if fmt == "csv":
+        df.to_csv(path, index=False, sep=sep)
+        return path
+
+    df = apply_review_dtypes(df.copy())
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(path)
+    return path
+
+
+def iter_reviews(path, chunksize, fmt=None, columns=None, sep=",", compact=False, arrow_strings=False):
+    """
+    Read a review table as a stream of DataFrames of at most chunksize rows
+    (feather files yield their record batches as written). Only one chunk is
+    held in memory at a time.
+    """
+    path, fmt = resolve_input(path, fmt)
+    if fmt != "csv":
+        columns = _select_columns(path, fmt, columns)
+    if fmt == "csv":
+        for df in pd.read_csv(path, sep=sep, usecols=columns, chunksize=chunksize):
+            yield compact_reviews(df, arrow_strings=arrow_strings, report=False) if compact else df
+        return
+
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+    else:
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        df = batch.to_pandas()
+        if columns is not None:
+            df = df[[column for column in columns if column in df.columns]]
+        df = apply_review_dtypes(df)
+        yield compact_reviews(df, arrow_strings=arrow_strings, report=False) if compact else df
+
+
+class ReviewWriter:
+    """
+    Incremental review table writer: each write() appends one frame. CSV
+    output gets the header once; Parquet / feather output uses the schema of
+    the first frame and gets one row group / record batch per write. Columnar
+    files are only readable after close(). append=True continues an existing
+    CSV file instead of replacing it (CSV only).
+    """
+
+    def __init__(self, path, fmt="csv", sep=",", append=False):
+        if append and fmt != "csv":
+            raise ValueError("Only CSV output can be appended to")
+        self.path = format_path(path, fmt)
+        self.fmt = fmt
+        self.sep = sep
+        self.append = append
+        self.rows = 0
+        self._writer = None
+        self._columns = None
+
+    def write(self, df):
+        if self._columns is None:
+            self._columns = list(df.columns)
+            self._open()
+        df = df[self._columns]
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="a", header=False, index=False, sep=self.sep)
+        else:
+            df = apply_review_dtypes(df.copy())
+            for column in df.columns:
+                if isinstance(df[column].dtype, pd.CategoricalDtype):
+                    df[column] = df[column].astype(object)
+            self._writer.write_table(self._pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        self.rows += len(df)
+
+    def _open(self):
+        if self.fmt == "csv":
+            if not (self.append and os.path.exists(self.path) and os.path.getsize(self.path) > 0):
+                pd.DataFrame(columns=self._columns).to_csv(self.path, index=False, sep=self.sep)
+            return
+        import pyarrow as pa
+
+        self._pa = pa
+        self._schema = arrow_schema(self._columns)
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self._schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,102 @@
+"""
+Text helpers shared by the pipeline stages: normalization, stable content
+digests and language checks for review texts.
+"""
+
+import hashlib
+import re
+
+
+DIGEST_SIZE = 16
+
+# Scripts that never occur in English reviews
+NON_ENGLISH_SCRIPTS = re.compile(
+    r'[\u4e00-\u9fff'           # Chinese
+    r'\u3040-\u309f\u30a0-\u30ff'  # Japanese
+    r'\u0400-\u04ff'            # Cyrillic
+    r'\u0590-\u05ff'            # Hebrew
+    r'\u0600-\u06ff]'           # Arabic
+)
+
+# Pre-pass thresholds: texts with fewer ASCII letters than MIN_ASCII_RATIO, or
+# where more than MAX_NON_ENGLISH_SCRIPT_RATIO of the letters are in one of
+# NON_ENGLISH_SCRIPTS, are rejected outright (a stray emoticon like ツ is not
+# enough); all-ASCII texts of at least ENGLISH_MIN_WORDS words where
+# ENGLISH_STOPWORD_RATIO of the words are common English function words are
+# accepted. Everything in between goes to the full detector.
+MIN_ASCII_RATIO = 0.6
+MAX_NON_ENGLISH_SCRIPT_RATIO = 0.2
+ENGLISH_MIN_WORDS = 8
+ENGLISH_STOPWORD_RATIO = 0.3
+ENGLISH_STOPWORDS = frozenset((
+    "a", "about", "after", "all", "an", "and", "are", "as", "at", "be", "but", "by",
+    "can", "do", "don't", "for", "from", "game", "has", "have", "i", "if", "in", "is",
+    "it", "it's", "its", "just", "like", "me", "my", "not", "of", "on", "or", "so",
+    "that", "the", "this", "to", "was", "what", "when", "with", "you", "your",
+))
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+
+def normalize_text(text):
+    """Collapse all whitespace runs to single spaces and strip the ends"""
+    return " ".join(str(text).split())
+
+
+def text_digest(text):
+    """
+    Stable 16-byte blake2b digest of the normalized text. Unlike hash(), it is
+    identical across processes and runs, so it can be stored and shared.
+    """
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+def has_non_english_script(text):
+    """True if the text contains Chinese, Japanese, Cyrillic, Hebrew or Arabic characters"""
+    return NON_ENGLISH_SCRIPTS.search(text) is not None
+
+
+def quick_is_english(text):
+    """
+    Cheap language pre-pass. Returns True/False when the answer is clear from
+    the script and ASCII ratio alone, and None when the full detector is needed.
+    """
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return False
+    script_letters = len(NON_ENGLISH_SCRIPTS.findall(text))
+    if script_letters / len(letters) > MAX_NON_ENGLISH_SCRIPT_RATIO:
+        return False
+    ascii_letters = sum(1 for ch in letters if ch.isascii())
+    if ascii_letters / len(letters) < MIN_ASCII_RATIO:
+        return False
+    if ascii_letters == len(letters):
+        words = WORD_PATTERN.findall(text.lower())
+        if len(words) >= ENGLISH_MIN_WORDS:
+            stopwords = sum(1 for word in words if word in ENGLISH_STOPWORDS)
+            if stopwords / len(words) >= ENGLISH_STOPWORD_RATIO:
+                return True
+    return None
+
+
+def seed_language_detector():
+    """Make langdetect deterministic in this process (also a pool initializer)"""
+    from langdetect import DetectorFactory
+
+    DetectorFactory.seed = 0
+
+
+def detect_languages(texts):
+    """
+    Run langdetect on a chunk of texts; returns language codes with "" for
+    texts it cannot classify. Module-level so it can run on a process pool.
+    """
+    from langdetect import detect
+    from langdetect.lang_detect_exception import LangDetectException
+
+    languages = []
+    for text in texts:
+        try:
+            languages.append(detect(text))
+        except LangDetectException:
+            languages.append("")
+    return languages
@@ -0,0 +1,130 @@
+"""
+Tests for the HTTP backend of the scraper (iter_appreviews_pages and
+scrape_reviews_via_api) against a local stub server that replays recorded
+appreviews JSON pages by cursor.
+"""
+
+import copy
+import importlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+scrape = importlib.import_module("1_data_scrape")
+
+with open(os.path.join(ROOT, "tests", "fixtures", "appreviews_pages.json"), encoding="utf-8") as f:
+    RECORDED_PAGES = json.load(f)
+
+GAME = {"game_id": 730, "game_name": "Counter-Strike 2", "genre": "FPS"}
+FIRST_CURSOR = "*"
+SECOND_CURSOR = RECORDED_PAGES[FIRST_CURSOR]["cursor"]
+THIRD_CURSOR = RECORDED_PAGES[SECOND_CURSOR]["cursor"]
+LAST_CURSOR = RECORDED_PAGES[THIRD_CURSOR]["cursor"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        cursor = parse_qs(url.query)["cursor"][0]
+        self.server.requests.append((url.path, cursor))
+        body = json.dumps(self.server.pages.get(cursor, {"success": 1, "reviews": []})).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """Local appreviews server; tests may edit server.pages and inspect server.requests"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.pages = copy.deepcopy(RECORDED_PAGES)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        scrape, "APPREVIEWS_URL_TEMPLATE", f"http://127.0.0.1:{server.server_address[1]}/appreviews/{{game_id}}"
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+
+def test_pages_follow_the_cursor_until_no_reviews_are_left(stub_server, session):
+    pages = list(scrape.iter_appreviews_pages(session, 730, "positivereviews"))
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert stub_server.requests == [
+        ("/appreviews/730", FIRST_CURSOR),
+        ("/appreviews/730", SECOND_CURSOR),
+        ("/appreviews/730", THIRD_CURSOR),
+        ("/appreviews/730", LAST_CURSOR),
+    ]
+
+
+def test_repeated_cursor_stops_paging(stub_server, session):
+    stub_server.pages[SECOND_CURSOR]["cursor"] = FIRST_CURSOR
+
+    pages = list(scrape.iter_appreviews_pages(session, 730, "positivereviews"))
+
+    assert [len(page) for page in pages] == [3, 3]
+    assert [cursor for _, cursor in stub_server.requests] == [FIRST_CURSOR, SECOND_CURSOR]
+
+
+def test_unsuccessful_response_raises(stub_server, session):
+    stub_server.pages[SECOND_CURSOR] = {"success": 0}
+
+    pages = scrape.iter_appreviews_pages(session, 730, "negativereviews")
+    assert len(next(pages)) == 3
+    with pytest.raises(RuntimeError, match="not successful"):
+        next(pages)
+
+
+def test_scrape_skips_empty_and_duplicate_reviews(stub_server, session):
+    reviews = scrape.scrape_reviews_via_api(session, GAME, "positivereviews", target_count=100)
+
+    # 8 recorded reviews: one is empty and one repeats an earlier text
+    assert len(reviews) == 6
+    assert len({review["review_content"] for review in reviews}) == 6
+    assert all(review["review_content"] for review in reviews)
+    first = reviews[0]
+    assert first["game_id"] == 730
+    assert first["sentiment"] == "positive"
+    assert first["play_hours"] == 10.0
+    assert first["is_recommended"] is True
+
+
+def test_scrape_stops_at_target_count(stub_server, session):
+    reviews = scrape.scrape_reviews_via_api(session, GAME, "positivereviews", target_count=3)
+
+    assert len(reviews) == 3
+    # The target is reached on the second page, so the third is never requested
+    assert [cursor for _, cursor in stub_server.requests] == [FIRST_CURSOR, SECOND_CURSOR]
+
+
+def test_scrape_passes_reviews_to_on_review(stub_server, session):
+    received = []
+
+    reviews = scrape.scrape_reviews_via_api(session, GAME, "positivereviews", target_count=4,
+                                            on_review=received.append)
+
+    assert reviews == []
+    assert len(received) == 4
@@ -0,0 +1,71 @@
+"""
+Parity tests for the toxicity inference backends: every non-torch backend must
+return the six scores for a fixed set of reviews within PARITY_TOLERANCES of
+the reference PyTorch model. Skipped when Detoxify is not installed; the ONNX
+backends are skipped without ONNX Runtime.
+"""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("detoxify")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+toxicity = importlib.import_module("3_toxicity_analysis")
+
+MODEL_NAME = "original"
+REVIEWS = [
+    "Great game, I have sunk hundreds of hours into it and still love every match.",
+    "Servers crash every evening and support never answers. Fix your game.",
+    "You are all braindead idiots if you think this update is good.",
+    "ok",
+    "The story is slow at first but the last act is one of the best I have played, "
+    "and the soundtrack alone is worth the price. Co-op with friends is a blast too.",
+    "uninstall this garbage, the devs are clowns and the community is worse",
+    "Relaxing farming sim, perfect after work.",
+    "I will find the guy who designed this level and make him pay.",
+]
+
+
+def score(model):
+    batches = toxicity.length_bucketed_batches(toxicity.token_lengths(model, REVIEWS))
+    return toxicity.score_reviews(model, REVIEWS, batches, show_progress=False)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def onnx_model_dir(tmp_path_factory):
+    """Export ONNX graphs to a temporary directory instead of the working directory"""
+    original = toxicity.ONNX_MODEL_DIR
+    toxicity.ONNX_MODEL_DIR = str(tmp_path_factory.mktemp("onnx"))
+    yield toxicity.ONNX_MODEL_DIR
+    toxicity.ONNX_MODEL_DIR = original
+
+
+@pytest.fixture(scope="module")
+def reference_scores():
+    return score(toxicity.load_model(MODEL_NAME, "torch"))
+
+
+@pytest.mark.parametrize("backend", [backend for backend in toxicity.BACKENDS if backend != "torch"])
+def test_backend_scores_match_torch(backend, reference_scores):
+    if backend in toxicity.ONNX_BACKENDS:
+        pytest.importorskip("onnxruntime")
+    if backend == "onnx-int8":
+        pytest.importorskip("onnx")
+
+    model = toxicity.load_model(MODEL_NAME, backend)
+    predicted = model.predict(REVIEWS[:2])
+    assert set(toxicity.SCORE_KEYS) <= set(predicted)
+    assert all(len(predicted[key]) == 2 for key in toxicity.SCORE_KEYS)
+
+    scores = score(model)
+    tolerance = toxicity.PARITY_TOLERANCES[backend]
+    for key in toxicity.SCORE_KEYS:
+        assert scores[key].shape == reference_scores[key].shape == (len(REVIEWS),)
+        drift = np.abs(scores[key] - reference_scores[key]).max()
+        assert drift <= tolerance, f"{key} drifted {drift:.2e} from torch (tolerance {tolerance:.0e})"